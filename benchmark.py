@@ -0,0 +1,194 @@
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Any
+
+import numpy as np
+import pyglet
+
+# No window is opened, keep pyglet (used by the fake MIDI key map) off the display
+pyglet.options["headless"] = True
+
+import moderngl
+import moderngl_window as mglw
+
+from inputs.input_manager import MidiInputManager
+from scenes.scenes_manager import ScenesManager
+from scenes.shader_disk_cache import configure_driver_shader_cache
+from top_level.logger import get_logger, setup_logging
+from top_level.profiler import GPU_SPANS, FrameProfiler
+
+
+PERCENTILES = (50, 90, 99)
+
+
+def create_headless_context(backend: str | None = None) -> moderngl.Context:
+    """
+    Create a standalone GL context (EGL on Linux, so no display is needed) and
+    make it the moderngl_window context
+    """
+    # Read by the driver when the context is created, like main.py's window
+    configure_driver_shader_cache()
+    if backend is None and platform.system() == "Linux":
+        backend = "egl"
+    kwargs: dict[str, Any] = {"backend": backend} if backend else {}
+    ctx = moderngl.create_standalone_context(require=330, **kwargs)
+    mglw.activate_context(ctx=ctx)
+    return ctx
+
+
+def parse_resolution(value: str) -> tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def summarize(samples_ns) -> dict:
+    """Summary statistics of nanosecond samples, in milliseconds"""
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e6
+    if samples.size == 0:
+        return {}
+    summary = {"mean": float(samples.mean()), "max": float(samples.max())}
+    for percentile in PERCENTILES:
+        summary[f"p{percentile}"] = float(np.percentile(samples, percentile))
+    return summary
+
+
+def benchmark_scene(
+    ctx, sm: ScenesManager, scene_index: int, resolution, res_factor, args
+) -> dict:
+    width, height = resolution
+    scene = sm.scenes[scene_index]
+    if res_factor is not None:
+        scene.res_factor = res_factor
+
+    target_texture = ctx.texture((width, height), 4)
+    target = ctx.framebuffer([target_texture])
+    frame_time = 1.0 / args.fps
+    budget_ns = 1e9 / args.fps
+
+    sm.change_to_scene(scene_index)
+    frame_ns = []
+    phases_ns: dict[str, list] = {}
+    gpu_ns: dict[str, list] = {name: [] for name in GPU_SPANS}
+    gpu_total_ns = []
+    for frame in range(args.warmup + args.frames):
+        start = time.perf_counter_ns()
+        sm.render(frame * frame_time, frame_time, (width, height, 1.0), target=target)
+        elapsed = time.perf_counter_ns() - start
+        frame_times = sm.profiler.end_frame()
+        ctx.finish()
+
+        if frame < args.warmup:
+            continue
+
+        frame_ns.append(elapsed)
+        for name, value in frame_times.cpu_ns.items():
+            phases_ns.setdefault(name, []).append(value)
+        for name in GPU_SPANS:
+            gpu_ns[name].append(frame_times.gpu_ns.get(name, 0))
+        gpu_total_ns.append(sum(frame_times.gpu_ns.values()))
+
+    target.release()
+    target_texture.release()
+
+    fbo_texture = sm.fbo_texture
+    assert fbo_texture is not None, "A scene was rendered, its FBO exists"
+    gpu_total = summarize(gpu_total_ns)
+    return {
+        "scene": scene.name,
+        "resolution": [width, height],
+        "res_factor": scene.res_factor,
+        "fbo_size": [fbo_texture.width, fbo_texture.height],
+        "cpu_frame_ms": summarize(frame_ns),
+        "cpu_phase_ms": {name: summarize(values) for name, values in phases_ns.items()},
+        "gpu_ms": {
+            **{name: summarize(values) for name, values in gpu_ns.items()},
+            "total": gpu_total,
+        },
+        "frames_over_budget": int(
+            sum(1 for cpu, gpu in zip(frame_ns, gpu_total_ns) if max(cpu, gpu) > budget_ns)
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SynMix - Headless render benchmark of every scene"
+    )
+    parser.add_argument("--frames", type=int, default=120, help="Measured frames per run")
+    parser.add_argument("--warmup", type=int, default=10, help="Frames rendered before measuring")
+    parser.add_argument(
+        "--resolutions",
+        type=parse_resolution,
+        nargs="+",
+        default=[(1920, 1080)],
+        help="Output resolutions, e.g. 1920x1080 3840x2160",
+    )
+    parser.add_argument(
+        "--res-factors",
+        type=float,
+        nargs="+",
+        default=None,
+        help="First pass resolution factors to run (default: each scene's own)",
+    )
+    parser.add_argument("--scenes", nargs="+", default=None, help="Names of the scenes to run")
+    parser.add_argument("--fps", type=float, default=60.0, help="Target frame rate (frame budget)")
+    parser.add_argument("--backend", default=None, help="moderngl standalone backend (e.g. egl)")
+    parser.add_argument("--output", default="benchmark.json", help="JSON report path ('-' for stdout)")
+    args = parser.parse_args()
+
+    setup_logging()
+    ctx = create_headless_context(args.backend)
+    MidiInputManager(None)
+    sm = ScenesManager(ctx)
+    sm.profiler = FrameProfiler(ctx, gpu_span_names=GPU_SPANS)
+    # Only the scene being measured is rendered: no background compiles of the
+    # other scenes, and no hot reloader (it is only started by main.py)
+    sm.is_prewarm_enabled = False
+    # Time the scenes with their actual textures
+    sm.texture_loader.finish()
+
+    scene_indices = [
+        index
+        for index, name in enumerate(sm.scenes.names)
+        if args.scenes is None or name in args.scenes
+    ]
+    results = []
+    for scene_index in scene_indices:
+        original_res_factor = sm.scenes[scene_index].res_factor
+        for resolution in args.resolutions:
+            for res_factor in args.res_factors or [None]:
+                result = benchmark_scene(ctx, sm, scene_index, resolution, res_factor, args)
+                results.append(result)
+                get_logger().info(
+                    "%-20s %4dx%-4d x%-4s cpu p50 %6.2f ms  gpu p50 %7.2f ms  p99 %7.2f ms",
+                    result["scene"],
+                    *result["resolution"],
+                    result["res_factor"] or 1.0,
+                    result["cpu_frame_ms"]["p50"],
+                    result["gpu_ms"]["total"]["p50"],
+                    result["gpu_ms"]["total"]["p99"],
+                )
+        sm.scenes[scene_index].res_factor = original_res_factor
+    sm.profiler.close()
+    sm.close()
+
+    report = {
+        "renderer": ctx.info["GL_RENDERER"],
+        "gl_version": ctx.info["GL_VERSION"],
+        "frames": args.frames,
+        "fps": args.fps,
+        "results": results,
+    }
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+    else:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        get_logger().info("Benchmark report written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+import queue
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from inputs.audio_analysis import AUDIO_BLOCK_SIZE, AudioAnalyzer, AudioFrame
+from top_level.logger import get_logger
+
+try:
+    import sounddevice
+    SOUNDDEVICE_AVAILABLE = True
+except (ImportError, OSError):
+    # OSError when the PortAudio library itself is missing
+    SOUNDDEVICE_AVAILABLE = False
+
+
+DEFAULT_AUDIO_SAMPLE_RATE = 44100
+# Blocks the device callback may queue before the analysis thread drops them
+AUDIO_QUEUE_BLOCKS = 8
+AUDIO_READ_TIMEOUT = 0.5
+
+_WAV_SAMPLE_TYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+
+class WavAudioSource:
+    """
+    Mono blocks of a WAV file, paced to real time so it plays like a device.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        block_size: int = AUDIO_BLOCK_SIZE,
+        is_loop: bool = True,
+        is_realtime: bool = True,
+    ):
+        """
+        Args:
+            path: WAV file (8, 16 or 32 bit PCM)
+            block_size: Samples per block
+            is_loop: Restart from the beginning at the end of the file
+            is_realtime: Wait for the duration of each block before returning the next
+        """
+        self.path = Path(path)
+        self.block_size = block_size
+        self.is_loop = is_loop
+        self.is_realtime = is_realtime
+        self._wav = wave.open(str(self.path), "rb")
+        self.sample_rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        sample_width = self._wav.getsampwidth()
+        if sample_width not in _WAV_SAMPLE_TYPES:
+            raise ValueError(
+                f"Unsupported WAV sample width of {sample_width * 8} bits in {self.path.name}."
+            )
+        self._sample_type = _WAV_SAMPLE_TYPES[sample_width]
+        self._next_block_time: Optional[float] = None
+
+    def read_block(self) -> Optional[np.ndarray]:
+        """
+        Returns:
+            The next block of float samples in [-1, 1], None at the end of the file
+        """
+        data = self._wav.readframes(self.block_size)
+        if len(data) < self.block_size * self.channels * self._wav.getsampwidth():
+            if not self.is_loop:
+                return None
+            self._wav.rewind()
+            data += self._wav.readframes(self.block_size - self._frame_count(data))
+
+        samples = self._to_float(data).reshape(-1, self.channels).mean(axis=1)
+        if len(samples) < self.block_size:
+            # Files shorter than a block
+            samples = np.pad(samples, (0, self.block_size - len(samples)))
+
+        if self.is_realtime:
+            self._wait_for_block()
+        return samples
+
+    def close(self):
+        self._wav.close()
+
+    def _frame_count(self, data: bytes) -> int:
+        return len(data) // (self.channels * self._wav.getsampwidth())
+
+    def _to_float(self, data: bytes) -> np.ndarray:
+        samples = np.frombuffer(data, dtype=self._sample_type).astype(np.float32)
+        if self._sample_type is np.uint8:
+            return (samples - 128.0) / 128.0
+        return samples / float(np.iinfo(self._sample_type).max)
+
+    def _wait_for_block(self):
+        now = time.perf_counter()
+        if self._next_block_time is None:
+            self._next_block_time = now
+        self._next_block_time += self.block_size / self.sample_rate
+        # Late after a stall: catch up from now instead of rushing through blocks
+        self._next_block_time = max(self._next_block_time, now - 1.0)
+        delay = self._next_block_time - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DeviceAudioSource:
+    """Mono blocks captured from a sound device (requires the sounddevice package)"""
+
+    def __init__(
+        self,
+        device=None,
+        block_size: int = AUDIO_BLOCK_SIZE,
+        sample_rate: int = DEFAULT_AUDIO_SAMPLE_RATE,
+    ):
+        """
+        Args:
+            device: sounddevice device index or name, None for the default input
+            block_size: Samples per block
+            sample_rate: Samples per second
+        """
+        if not SOUNDDEVICE_AVAILABLE:
+            raise RuntimeError(
+                "Audio capture requires sounddevice. Install it with: pip install sounddevice"
+            )
+
+        self.block_size = block_size
+        self.sample_rate = sample_rate
+        self.overflows = 0
+        self._blocks: queue.Queue = queue.Queue(maxsize=AUDIO_QUEUE_BLOCKS)
+        self._is_closed = False
+        self._stream = sounddevice.InputStream(
+            device=device,
+            channels=1,
+            samplerate=sample_rate,
+            blocksize=block_size,
+            dtype="float32",
+            callback=self._on_block,
+        )
+        self._stream.start()
+
+    def _on_block(self, indata, frames, time_info, status):
+        # Runs on the audio driver thread: copy and hand over, nothing else
+        try:
+            self._blocks.put_nowait(indata[:, 0].copy())
+        except queue.Full:
+            self.overflows += 1
+
+    def read_block(self) -> Optional[np.ndarray]:
+        """
+        Returns:
+            The next captured block, None once the source is closed
+        """
+        while not self._is_closed:
+            try:
+                return self._blocks.get(timeout=AUDIO_READ_TIMEOUT)
+            except queue.Empty:
+                continue
+        return None
+
+    def close(self):
+        self._is_closed = True
+        self._stream.stop()
+        self._stream.close()
+
+
+def open_audio_source(wav_path: Optional[str] = None, device: Optional[str] = None):
+    """
+    Open the WAV file source if a path is given, otherwise the sound device source
+
+    Args:
+        wav_path: WAV file to play
+        device: Device index or name, empty or None for the default input
+    """
+    if wav_path:
+        return WavAudioSource(Path(wav_path))
+    selected: Union[int, str, None] = device
+    if device and device.isdigit():
+        selected = int(device)
+    # Index 0 is a device too, only an empty name means the default input
+    return DeviceAudioSource(selected if selected not in ("", None) else None)
+
+
+class AudioInput:
+    """
+    Reads and analyzes an audio source on its own thread.
+
+    Every analyzed block is published as a new immutable AudioFrame by swapping
+    a single reference, so the render thread reads `latest` without locking and
+    never waits on the audio thread.
+    """
+
+    def __init__(self, source, analyzer: Optional[AudioAnalyzer] = None):
+        self.source = source
+        self.analyzer = analyzer or AudioAnalyzer(source.sample_rate, source.block_size)
+        self.latest: Optional[AudioFrame] = None
+        self.max_analysis_time = 0.0
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="audio-input", daemon=True)
+
+    @property
+    def band_count(self) -> int:
+        return self.analyzer.band_count
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self.source.close()
+
+    def _run(self):
+        block_duration = self.analyzer.block_duration
+        while not self._stop_event.is_set():
+            try:
+                block = self.source.read_block()
+            except Exception as e:
+                get_logger().error("Audio input stopped: %s", e)
+                return
+            if block is None:
+                return
+
+            start = time.perf_counter()
+            frame = self.analyzer.analyze(block)
+            elapsed = time.perf_counter() - start
+            self.latest = frame
+
+            if elapsed > self.max_analysis_time:
+                self.max_analysis_time = elapsed
+                if elapsed > block_duration / 2:
+                    get_logger().warning(
+                        "Audio analysis took %.1f ms of a %.1f ms block",
+                        elapsed * 1000,
+                        block_duration * 1000,
+                    )
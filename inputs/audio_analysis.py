@@ -0,0 +1,155 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+
+AUDIO_BLOCK_SIZE = 1024
+AUDIO_BAND_COUNT = 32
+AUDIO_MIN_FREQUENCY = 30.0
+AUDIO_MAX_FREQUENCY = 16000.0
+
+# Band levels are mapped from this many dB below the band's running peak to it
+AUDIO_DYNAMIC_RANGE_DB = 60.0
+# How fast the running peak of a band falls back after a loud passage
+AUDIO_PEAK_RELEASE_DB_PER_SECOND = 3.0
+
+# Onsets are flux values over mean + sensitivity * std of the last second
+ONSET_HISTORY_SECONDS = 1.0
+ONSET_SENSITIVITY = 1.5
+ONSET_MIN_FLUX = 1.0
+MIN_BEAT_INTERVAL = 0.2
+BEAT_DECAY_SECONDS = 0.15
+
+_EPSILON = 1e-12
+
+
+class AudioFrame(NamedTuple):
+    """Analysis of one block of audio. Never modified once published."""
+
+    # Level of each band from 0 to 1, low frequencies first (float32)
+    bands: np.ndarray
+    # Root mean square of the block samples
+    rms: float
+    # Positive change of the band levels since the previous block (dB)
+    flux: float
+    is_onset: bool
+    is_beat: bool
+    # 1 on a beat, decaying towards 0 until the next one
+    beat: float
+    # Index of the block in the stream, and its time in seconds
+    block_index: int
+    time: float
+
+
+class AudioAnalyzer:
+    """
+    Windowed FFT of fixed-size mono blocks into log-spaced band levels, with
+    spectral flux onsets and a beat envelope.
+
+    Everything a block needs (window, band bin ranges, history ring) is computed
+    once, so analyzing a block is a handful of vectorized NumPy operations.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        block_size: int = AUDIO_BLOCK_SIZE,
+        band_count: int = AUDIO_BAND_COUNT,
+    ):
+        """
+        Args:
+            sample_rate: Samples per second of the blocks
+            block_size: Samples per block
+            band_count: Number of frequency bands
+        """
+        bin_count = block_size // 2 + 1
+        if band_count >= bin_count:
+            raise ValueError(
+                f"Blocks of {block_size} samples can't be split into {band_count} bands."
+            )
+
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.band_count = band_count
+        self.block_duration = block_size / sample_rate
+        self._window = np.hanning(block_size).astype(np.float32)
+
+        # Log-spaced band edges in FFT bins, every band at least one bin wide
+        max_frequency = min(AUDIO_MAX_FREQUENCY, sample_rate / 2)
+        edges = np.geomspace(AUDIO_MIN_FREQUENCY, max_frequency, band_count + 1)
+        bin_edges = np.round(edges * block_size / sample_rate).astype(np.int64)
+        bin_edges[0] = max(bin_edges[0], 1)
+        for index in range(1, band_count + 1):
+            bin_edges[index] = max(bin_edges[index], bin_edges[index - 1] + 1)
+        if bin_edges[-1] > bin_count:
+            bin_edges -= bin_edges[-1] - bin_count
+        self._band_starts = bin_edges[:-1]
+        self._band_end = int(bin_edges[-1])
+        self._band_widths = np.diff(bin_edges).astype(np.float32)
+
+        self._peak_db = np.full(band_count, -AUDIO_DYNAMIC_RANGE_DB, dtype=np.float32)
+        self._peak_release_db = AUDIO_PEAK_RELEASE_DB_PER_SECOND * self.block_duration
+        self._previous_db = None
+
+        history = max(2, round(ONSET_HISTORY_SECONDS / self.block_duration))
+        self._flux_history = np.zeros(history, dtype=np.float32)
+        self._beat_decay = math.exp(-self.block_duration / BEAT_DECAY_SECONDS)
+        self._beat = 0.0
+        self._last_beat_index = -math.inf
+        self._index = 0
+
+    def analyze(self, block: np.ndarray) -> AudioFrame:
+        """
+        Args:
+            block: block_size mono float samples in [-1, 1]
+
+        Returns:
+            The analysis of the block
+        """
+        spectrum = np.fft.rfft(block * self._window)
+        power = spectrum.real**2 + spectrum.imag**2
+        band_power = (
+            np.add.reduceat(power[: self._band_end], self._band_starts) / self._band_widths
+        )
+        band_db = (10.0 * np.log10(band_power + _EPSILON)).astype(np.float32)
+
+        self._peak_db = np.maximum(band_db, self._peak_db - self._peak_release_db)
+        bands = np.clip(
+            (band_db - self._peak_db) / AUDIO_DYNAMIC_RANGE_DB + 1.0, 0.0, 1.0
+        ).astype(np.float32)
+
+        # Spectral flux over the bands, against an adaptive threshold
+        if self._previous_db is None:
+            flux = 0.0
+        else:
+            flux = float(np.maximum(band_db - self._previous_db, 0.0).sum())
+        self._previous_db = band_db
+
+        history = self._flux_history
+        threshold = history.mean() + ONSET_SENSITIVITY * history.std()
+        is_onset = flux > max(threshold, ONSET_MIN_FLUX)
+        history[self._index % len(history)] = flux
+
+        index = self._index
+        is_beat = (
+            is_onset
+            and (index - self._last_beat_index) * self.block_duration >= MIN_BEAT_INTERVAL
+        )
+        if is_beat:
+            self._beat = 1.0
+            self._last_beat_index = index
+        else:
+            self._beat *= self._beat_decay
+
+        self._index += 1
+        return AudioFrame(
+            bands=bands,
+            rms=float(np.sqrt(np.mean(np.square(block)))),
+            flux=flux,
+            is_onset=bool(is_onset),
+            is_beat=bool(is_beat),
+            beat=self._beat,
+            block_index=index,
+            time=index * self.block_duration,
+        )
@@ -0,0 +1,139 @@
+# Microbenchmark of MIDI message handling: the original per-message path
+# (enum + descriptor + message dict + NamedTuple lookups) against the raw bytes
+# event queue with its integer dispatch table.
+#
+# The two gains are reported separately: the dispatch table alone, with the
+# queue processed after every message so that nothing is coalesced, and the
+# per-frame coalescing of scroller ticks and knob values on top of it.
+#
+# Run with:
+#     uv run inputs/bench_midi_dispatch.py
+import sys
+import time
+from pathlib import Path
+
+import mido
+
+# Add parent directory to path so we can import from inputs, params, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+from inputs.buttons import Button, ButtonType
+from inputs.input_manager import MidiInputManager
+from inputs.midi import (
+    MIDI_DEC_VALUE,
+    MIDI_INC_VALUE,
+    MidiEventType,
+    MidiGetter,
+    get_midi_event_descriptor,
+)
+from params.params import Param
+from params.valuecontrollers import (
+    NormalizedController,
+    RangedController,
+    ToggleController,
+)
+
+
+MESSAGES_PER_FRAME = 64
+FRAMES = 2000
+
+
+def legacy_handle_midi_input(manager: MidiInputManager, event_msg: mido.Message):
+    """The per-message path the dispatch table replaced"""
+    event_dict = event_msg.dict()
+    event_type = MidiEventType(event_dict["type"])
+    descriptor = get_midi_event_descriptor(event_type)
+
+    selector_value = event_dict[descriptor.SELECTOR_FIELD]
+    event_selector = MidiGetter(event_type, selector_value)
+
+    binded_param = manager.param_bindings.get(
+        event_selector
+    ) or manager.secondary_param_bindings.get(event_selector)
+    binded_func = manager.general_funcs_bindings.get(event_selector)
+    if not binded_param and not binded_func:
+        return
+
+    value = event_dict[descriptor.VALUE_FIELD]
+    if binded_param:
+        binded_param.control_param(value)
+    elif binded_func:
+        binded_func(value)
+
+
+def create_controller(button: Button):
+    if button.button_type is ButtonType.KNOB:
+        is_pitch = button.midi_getter.event_type is MidiEventType.PITCH
+        return NormalizedController(min_value=0.0, max_value=1.0, is_pitch=is_pitch)
+    if button.button_type is ButtonType.SCROLLER:
+        return RangedController(min_value=-10.0, max_value=10.0, step=0.01)
+    return ToggleController()
+
+
+def generate_frames():
+    """Wheel and pitch heavy traffic, with a few knob turns and clicks"""
+    frames = []
+    for frame in range(FRAMES):
+        messages = []
+        for i in range(MESSAGES_PER_FRAME):
+            kind = i % 8
+            if kind < 4:
+                control = 36 + kind % 2  # LEFT_WHEEL / RIGHT_WHEEL
+                value = MIDI_INC_VALUE if (frame + i) % 3 else MIDI_DEC_VALUE
+                messages.append(mido.Message("control_change", control=control, value=value))
+            elif kind < 6:
+                pitch = (frame * 37 + i * 11) % 16384 - 8192
+                messages.append(mido.Message("pitchwheel", channel=kind % 2, pitch=pitch))
+            elif kind == 6:
+                messages.append(mido.Message("control_change", control=53, value=(frame + i) % 128))
+            else:
+                velocity = 127 if frame % 2 else 0
+                messages.append(mido.Message("note_on", note=9, velocity=velocity))
+        frames.append(messages)
+    return frames
+
+
+def run(label: str, frames, handle_frame) -> float:
+    start = time.perf_counter_ns()
+    for messages in frames:
+        handle_frame(messages)
+    elapsed = time.perf_counter_ns() - start
+    per_message = elapsed / (len(frames) * MESSAGES_PER_FRAME)
+    print(f"{label:40} {elapsed / 1e6:9.2f} ms total  {per_message:8.1f} ns/message")
+    return per_message
+
+
+if __name__ == "__main__":
+    manager = MidiInputManager(None)
+    for button in Button:
+        manager.bind_param(Param(button.name, button, create_controller(button)))
+
+    frames = generate_frames()
+
+    def legacy_frame(messages):
+        for message in messages:
+            legacy_handle_midi_input(manager, message)
+
+    def dispatch_table_frame(messages):
+        for message in messages:
+            manager._enqueue_midi_input(message)
+            manager.process_events()
+
+    def coalesced_frame(messages):
+        for message in messages:
+            manager._enqueue_midi_input(message)
+        manager.process_events()
+
+    # Warm up all paths once
+    legacy_frame(frames[0])
+    dispatch_table_frame(frames[0])
+    coalesced_frame(frames[0])
+
+    legacy = run("Legacy per-message path", frames, legacy_frame)
+    table = run("Dispatch table, no coalescing", frames, dispatch_table_frame)
+    coalesced = run("Dispatch table, coalesced per frame", frames, coalesced_frame)
+    print(f"Dispatch table speedup: {legacy / table:.2f}x")
+    print(f"Coalescing speedup:     {table / coalesced:.2f}x")
+    print(f"Total speedup:          {legacy / coalesced:.2f}x")
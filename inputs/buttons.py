@@ -85,3 +85,8 @@ class Button(Enum):
     @property
     def button_type(self) -> ButtonType:
         return self.value[1]
+
+
+BUTTON_TYPES_BY_MIDI_GETTER: dict[MidiGetter, ButtonType] = {
+    button.midi_getter: button.button_type for button in Button
+}
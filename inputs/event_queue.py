@@ -0,0 +1,51 @@
+from typing import Iterator, Tuple
+
+
+MIDI_EVENT_QUEUE_SIZE = 1024
+
+
+class MidiEventQueue:
+    """
+    Bounded ring buffer of raw MIDI events (status, data1, data2).
+
+    Lock-free for a single producer (the MIDI callback thread) and a single
+    consumer (the render loop): each index is only advanced by its owner, and
+    slots are preallocated so pushing an event doesn't allocate. Events pushed
+    while the buffer is full are dropped and counted in `overflows`.
+    """
+
+    def __init__(self, capacity: int = MIDI_EVENT_QUEUE_SIZE):
+        self.capacity = capacity
+        self._statuses = [0] * capacity
+        self._data1 = [0] * capacity
+        self._data2 = [0] * capacity
+        self._head = 0  # Next event to read, owned by the consumer
+        self._tail = 0  # Next slot to write, owned by the producer
+        self.overflows = 0
+
+    def __len__(self) -> int:
+        return self._tail - self._head
+
+    def push(self, status: int, data1: int, data2: int) -> bool:
+        tail = self._tail
+        if tail - self._head >= self.capacity:
+            self.overflows += 1
+            return False
+
+        slot = tail % self.capacity
+        self._statuses[slot] = status
+        self._data1[slot] = data1
+        self._data2[slot] = data2
+        # Publish the event only after its slot is written
+        self._tail = tail + 1
+        return True
+
+    def drain(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield the events pushed so far, oldest first"""
+        head = self._head
+        tail = self._tail
+        while head < tail:
+            slot = head % self.capacity
+            yield self._statuses[slot], self._data1[slot], self._data2[slot]
+            head += 1
+            self._head = head
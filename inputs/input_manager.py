@@ -3,9 +3,28 @@ from typing import Callable, Union
 
 import mido
 
-from inputs.buttons import Button
-from inputs.midi import MidiEventType, MidiGetter, get_midi_event_descriptor
+from inputs.buttons import BUTTON_TYPES_BY_MIDI_GETTER, Button, ButtonType
+from inputs.event_queue import MidiEventQueue
+from inputs.midi import (
+    MIDI_DEC_VALUE,
+    MIDI_DISPATCH_TABLE_SIZE,
+    MIDI_INC_VALUE,
+    MIDI_STATUS_CONTROL_CHANGE,
+    MIDI_STATUS_NOTE_OFF,
+    MIDI_STATUS_NOTE_ON,
+    MIDI_STATUS_PITCH,
+    MIDI_STATUS_TYPE_MASK,
+    MIN_PITCH,
+    STATUS_DISPATCH_BASES,
+    MidiGetter,
+    get_dispatch_index,
+)
 from params.params import Param
+from top_level.logger import get_logger
+
+
+# (button_type, param, func) of a dispatch index
+DispatchEntry = tuple[ButtonType | None, Param | None, Callable[[int], None] | None]
 
 
 class MidiInputManager:
@@ -17,7 +36,12 @@ class MidiInputManager:
 
         return cls._instance
 
-    def __init__(self, input_subname: str = ""):
+    def __init__(self, input_subname: str | None = ""):
+        """
+        Args:
+            input_subname: Part of the MIDI input name to open. None opens no
+                input, events are then only pushed to the event queue directly.
+        """
         if not hasattr(self, "_initialized"):
             self.scenes_change_funcs = None
             self.param_bindings: dict[MidiGetter, Param] = {}
@@ -25,6 +49,12 @@ class MidiInputManager:
             self.general_funcs_bindings: dict[MidiGetter, Callable[[int], None]] = {}
             self.fake_midi = None
             self.midi_input = None
+            self.event_queue = MidiEventQueue()
+            # Called with every drained (status, data1, data2), e.g. to record them
+            self.event_listener: Callable[[int, int, int], None] | None = None
+            self._reported_overflows = 0
+            # Rebuilt lazily whenever the bindings change
+            self._dispatch_table: list[DispatchEntry | None] | None = None
 
             # Check if we're dealing with fake MIDI on Windows
             if (
@@ -36,13 +66,13 @@ class MidiInputManager:
 
                 global_ctx = GlobalCtx()
                 self.fake_midi = global_ctx.fake_midi
-            else:
+            elif input_subname is not None:
                 try:
                     midi_input_name = next(
                         name for name in mido.get_input_names() if input_subname in name
                     )
                     self.midi_input = mido.open_input(
-                        midi_input_name, callback=self._handle_midi_input
+                        midi_input_name, callback=self._enqueue_midi_input
                     )
 
                 except StopIteration:
@@ -54,12 +84,19 @@ class MidiInputManager:
 
     def bind_param(self, param: Param):
         self.param_bindings[param.button.midi_getter] = param
+        self._dispatch_table = None
 
     def bind_secondary_param(self, param: Param):
         self.secondary_param_bindings[param.button.midi_getter] = param
+        self._dispatch_table = None
 
     def unbind_params(self):
         self.param_bindings = {}
+        self._dispatch_table = None
+
+    def unbind_secondary_params(self):
+        self.secondary_param_bindings = {}
+        self._dispatch_table = None
 
     def bind_general_funcs(
         self, event_selector: Union[Button, MidiGetter], afunc: Callable[[int], None]
@@ -70,37 +107,168 @@ class MidiInputManager:
             else event_selector
         )
         self.general_funcs_bindings[midi_getter] = afunc
+        self._dispatch_table = None
 
-    def _handle_midi_input(self, event_msg: mido.Message):
-        try:
-            event_type = MidiEventType(event_msg.type)
-            descriptor = get_midi_event_descriptor(event_type)
+    def _enqueue_midi_input(self, event_msg):
+        """
+        MIDI callback: only queue the raw event, it is applied by process_events
 
-            event_dict = event_msg.dict()
-            selector_value = event_dict[descriptor.SELECTOR_FIELD]
-            event_selector = MidiGetter(event_type, selector_value)
+        Args:
+            event_msg: The mido.Message received, its fields depend on its type
+        """
+        # Rebuild the status and data bytes from the message fields, which
+        # unlike event_msg.bytes() doesn't allocate a list per message
+        msg_type = event_msg.type
+        if msg_type == "control_change":
+            self.event_queue.push(
+                MIDI_STATUS_CONTROL_CHANGE | event_msg.channel,
+                event_msg.control,
+                event_msg.value,
+            )
+        elif msg_type == "pitchwheel":
+            pitch = event_msg.pitch - MIN_PITCH
+            self.event_queue.push(
+                MIDI_STATUS_PITCH | event_msg.channel, pitch & 0x7F, pitch >> 7
+            )
+        elif msg_type == "note_on" or msg_type == "note_off":
+            status = MIDI_STATUS_NOTE_ON if msg_type == "note_on" else MIDI_STATUS_NOTE_OFF
+            self.event_queue.push(
+                status | event_msg.channel, event_msg.note, event_msg.velocity
+            )
+        else:
+            # Rare messages, still queued for the event listener
+            raw = event_msg.bytes()
+            if len(raw) == 3:
+                self.event_queue.push(raw[0], raw[1], raw[2])
 
-            binded_param = self.param_bindings.get(
-                event_selector
-            ) or self.secondary_param_bindings.get(event_selector)
-            binded_func = self.general_funcs_bindings.get(event_selector)
+    def process_events(self):
+        """Apply the queued MIDI events, called once per frame by the render loop"""
+        if self.event_queue.overflows != self._reported_overflows:
+            self._reported_overflows = self.event_queue.overflows
+            get_logger().warning(
+                "MIDI event queue overflowed, %d events dropped so far",
+                self._reported_overflows,
+            )
 
-            if not binded_param and not binded_func:
-                print(f"No binding found for event: {event_dict}")
-                return
+        if self._dispatch_table is None:
+            self._dispatch_table = self._build_dispatch_table()
+        dispatch_table = self._dispatch_table
 
-            value = event_dict[descriptor.VALUE_FIELD]
-            if binded_param:
-                binded_param.control_param(value)
+        # Merge high-rate traffic per control: scroller ticks are summed and
+        # only the latest knob value is kept. Clicks are applied in order.
+        scroller_ticks: dict[int, int] = {}
+        knob_values: dict[int, int] = {}
+        event_listener = self.event_listener
+        for status, data1, data2 in self.event_queue.drain():
+            if event_listener is not None:
+                event_listener(status, data1, data2)
+
+            dispatch_base = STATUS_DISPATCH_BASES[status]
+            if dispatch_base < 0:
+                # e.g. note off, which the controller sends after every click.
+                # Keyed by status, so the rate limit applies per message kind.
+                get_logger().debug(
+                    "Unsupported MIDI status 0x%02x, event ignored: %s",
+                    status,
+                    (data1, data2),
+                )
+                continue
+
+            if status & MIDI_STATUS_TYPE_MASK == MIDI_STATUS_PITCH:
+                index = dispatch_base
+                value = ((data2 << 7) | data1) + MIN_PITCH
+            else:
+                index = dispatch_base + data1
+                value = data2
+
+            entry = dispatch_table[index]
+            if entry is None:
+                get_logger().debug("No binding found for event: %s", (status, data1, data2))
+                continue
+
+            button_type = entry[0]
+            if button_type is ButtonType.SCROLLER and (
+                value == MIDI_INC_VALUE or value == MIDI_DEC_VALUE
+            ):
+                tick = 1 if value == MIDI_INC_VALUE else -1
+                scroller_ticks[index] = scroller_ticks.get(index, 0) + tick
+            elif button_type is ButtonType.KNOB:
+                knob_values[index] = value
             else:
-                binded_func(value)
+                self._dispatch(self._handle_midi_event, entry, value)
+
+        # Only bound indices were merged, the None checks are for the type checker
+        for index, ticks in scroller_ticks.items():
+            entry = dispatch_table[index]
+            if ticks and entry is not None:
+                self._dispatch(self._handle_midi_ticks, entry, ticks)
+
+        for index, value in knob_values.items():
+            entry = dispatch_table[index]
+            if entry is not None:
+                self._dispatch(self._handle_midi_event, entry, value)
+
+    def _build_dispatch_table(self) -> list[DispatchEntry | None]:
+        """
+        Build the flat dispatch table of the current bindings
+
+        Returns:
+            List indexed by dispatch index of (button_type, param, func) entries,
+            None where nothing is bound
+        """
+        dispatch_table: list[DispatchEntry | None] = [None] * MIDI_DISPATCH_TABLE_SIZE
+        midi_getters = (
+            self.param_bindings.keys()
+            | self.secondary_param_bindings.keys()
+            | self.general_funcs_bindings.keys()
+        )
+        for midi_getter in midi_getters:
+            binded_param = self.param_bindings.get(
+                midi_getter
+            ) or self.secondary_param_bindings.get(midi_getter)
+            binded_func = self.general_funcs_bindings.get(midi_getter)
+            dispatch_table[get_dispatch_index(midi_getter)] = (
+                BUTTON_TYPES_BY_MIDI_GETTER.get(midi_getter),
+                binded_param,
+                binded_func,
+            )
+
+        return dispatch_table
+
+    @staticmethod
+    def _dispatch(
+        handler: Callable[[DispatchEntry, int], None], entry: DispatchEntry, amount: int
+    ):
+        """Apply an event, a failing binding is logged without stopping the frame"""
+        try:
+            handler(entry, amount)
+        except Exception:
+            _, binded_param, binded_func = entry
+            target = binded_param.name if binded_param else getattr(binded_func, "__name__", "")
+            get_logger().exception("Handling MIDI input for %s failed", target)
+
+    @staticmethod
+    def _handle_midi_event(entry: DispatchEntry, value: int):
+        _, binded_param, binded_func = entry
+        if binded_param:
+            binded_param.control_param(value)
+        elif binded_func:
+            binded_func(value)
 
-        except KeyError:
-            print(f"Invalid MIDI event: {event_msg}")
+    @staticmethod
+    def _handle_midi_ticks(entry: DispatchEntry, ticks: int):
+        """Apply the summed inc (positive) / dec (negative) ticks of a scroller"""
+        _, binded_param, binded_func = entry
+        if binded_param:
+            binded_param.control_ticks(ticks)
+        elif binded_func:
+            in_value = MIDI_INC_VALUE if ticks > 0 else MIDI_DEC_VALUE
+            for _ in range(abs(ticks)):
+                binded_func(in_value)
 
     def process_fake_midi_messages(self):
-        """Process pending fake MIDI messages (Windows compatibility)"""
+        """Queue pending fake MIDI messages (Windows compatibility)"""
         if self.fake_midi:
             pending_messages = self.fake_midi.get_pending_messages()
             for message in pending_messages:
-                self._handle_midi_input(message)
+                self._enqueue_midi_input(message)
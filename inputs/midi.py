@@ -16,6 +16,14 @@ MIDI_BUTTEN_RELEASE = 0
 MAX_PITCH = 8191
 MIN_PITCH = -8192
 
+# Raw MIDI status bytes (high nibble), the low nibble is the channel
+MIDI_STATUS_TYPE_MASK = 0xF0
+MIDI_STATUS_CHANNEL_MASK = 0x0F
+MIDI_STATUS_NOTE_OFF = 0x80
+MIDI_STATUS_NOTE_ON = 0x90
+MIDI_STATUS_CONTROL_CHANGE = 0xB0
+MIDI_STATUS_PITCH = 0xE0
+
 
 class MidiEventType(Enum):
     NOTE_ON = "note_on"
@@ -44,3 +52,39 @@ MIDI_EVENT_DESCRIPTORS = frozendict(
 
 def get_midi_event_descriptor(event_type: MidiEventType) -> MidiEventDesricptors:
     return MIDI_EVENT_DESCRIPTORS[event_type]
+
+
+
+# Flat dispatch table: one slot of 128 selectors per supported event type
+MIDI_SELECTORS_PER_TYPE = 128
+MIDI_DISPATCH_TABLE_SIZE = 3 * MIDI_SELECTORS_PER_TYPE
+EVENT_TYPE_DISPATCH_BASES = frozendict(
+    {
+        MidiEventType.NOTE_ON: 0,
+        MidiEventType.CONTROL_CHANGE: MIDI_SELECTORS_PER_TYPE,
+        MidiEventType.PITCH: 2 * MIDI_SELECTORS_PER_TYPE,
+    }
+)
+
+
+def get_dispatch_index(midi_getter: MidiGetter) -> int:
+    return EVENT_TYPE_DISPATCH_BASES[midi_getter.event_type] + midi_getter.selector_value
+
+
+def _status_dispatch_base(status: int) -> int:
+    status_type = status & MIDI_STATUS_TYPE_MASK
+    if status_type == MIDI_STATUS_NOTE_ON:
+        return EVENT_TYPE_DISPATCH_BASES[MidiEventType.NOTE_ON]
+    if status_type == MIDI_STATUS_CONTROL_CHANGE:
+        return EVENT_TYPE_DISPATCH_BASES[MidiEventType.CONTROL_CHANGE]
+    if status_type == MIDI_STATUS_PITCH:
+        # The pitch wheel is selected by its channel
+        return EVENT_TYPE_DISPATCH_BASES[MidiEventType.PITCH] + (
+            status & MIDI_STATUS_CHANNEL_MASK
+        )
+    return -1
+
+
+# Dispatch base by raw status byte (-1 for unsupported messages). Note on and
+# control change events add data1 to the base, pitch events use it as is.
+STATUS_DISPATCH_BASES = tuple(_status_dispatch_base(status) for status in range(256))
@@ -0,0 +1,119 @@
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+from inputs.event_queue import MidiEventQueue
+from top_level.logger import get_logger
+
+
+MIDI_TIMELINE_VERSION = 1
+
+
+class TimedMidiEvent(NamedTuple):
+    frame: int
+    time: float
+    status: int
+    data1: int
+    data2: int
+
+
+class MidiTimelineRecorder:
+    """
+    Writes every MIDI event applied during a show, with the frame and render
+    time it was applied at, as JSON lines after a header line.
+
+    The header holds what else a replay needs to take the same decisions: the
+    random seed, the starting scene and the transition settings.
+
+    The render thread only collects the events of a frame. They are handed
+    over once per frame to a background thread, which formats and writes them.
+    """
+
+    def __init__(self, output_path: Path, header: dict):
+        self.output_path = Path(output_path)
+        self._file = open(self.output_path, "w")
+        self._file.write(json.dumps({"version": MIDI_TIMELINE_VERSION, **header}) + "\n")
+        self._file.flush()
+        self.frame = -1
+        self.time = 0.0
+        self.event_count = 0
+        self._events: List[tuple] = []
+        self._batches: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._write_batches, name="midi-timeline-writer", daemon=True
+        )
+        self._thread.start()
+
+    def begin_frame(self, time: float):
+        """Start a frame, whose events are recorded at its render time"""
+        if self._events:
+            self._batches.put(self._events)
+            self._events = []
+        self.frame += 1
+        self.time = time
+
+    def record(self, status: int, data1: int, data2: int):
+        self._events.append((self.frame, self.time, status, data1, data2))
+        self.event_count += 1
+
+    def close(self):
+        """Write the events still pending and close the file"""
+        if self._events:
+            self._batches.put(self._events)
+            self._events = []
+        self._batches.put(None)
+        self._thread.join()
+        self._file.close()
+        get_logger().info(
+            "Recorded %d MIDI events to %s", self.event_count, self.output_path
+        )
+
+    def _write_batches(self):
+        while (events := self._batches.get()) is not None:
+            self._file.writelines(json.dumps(event) + "\n" for event in events)
+            self._file.flush()
+
+
+class MidiTimeline:
+    """A recorded timeline, replayed into a MIDI event queue by render time"""
+
+    def __init__(self, header: dict, events: List[TimedMidiEvent]):
+        self.header = header
+        self.events = events
+        self._next_event = 0
+        self.event_queue: Optional[MidiEventQueue] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "MidiTimeline":
+        with open(path, "r") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != MIDI_TIMELINE_VERSION:
+                raise ValueError(
+                    f"Unsupported MIDI timeline version {header.get('version')} in {path}."
+                )
+            events = [TimedMidiEvent(*json.loads(line)) for line in f if line.strip()]
+        return cls(header, events)
+
+    def play(self, event_queue: MidiEventQueue):
+        """Replay the timeline from its start into an event queue"""
+        self.event_queue = event_queue
+        self._next_event = 0
+
+    @property
+    def duration(self) -> float:
+        return self.events[-1].time if self.events else 0.0
+
+    def begin_frame(self, time: float):
+        """Queue the events recorded up to a render time"""
+        event_queue = self.event_queue
+        if event_queue is None:
+            # Not played yet
+            return
+
+        events = self.events
+        while self._next_event < len(events) and events[self._next_event].time <= time:
+            event = events[self._next_event]
+            event_queue.push(event.status, event.data1, event.data2)
+            self._next_event += 1
@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+import pyglet
+
+# Add parent directory to path so we can import from inputs, params, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+# No window is opened, keep pyglet (imported through the params) off the display
+pyglet.options["headless"] = True
+
+from inputs.buttons import Button
+from inputs.event_queue import MidiEventQueue
+from inputs.input_manager import MidiInputManager
+from inputs.midi import MIDI_DEC_VALUE, MIDI_INC_VALUE
+
+
+NOTE_ON = 0x90
+NOTE_OFF = 0x80
+CONTROL_CHANGE = 0xB0
+
+
+def selector(button: Button) -> int:
+    return button.midi_getter.selector_value
+
+
+def make_manager() -> MidiInputManager:
+    """The manager is a singleton, reset its bindings and queue for each test"""
+    manager = MidiInputManager(None)
+    manager.unbind_params()
+    manager.unbind_secondary_params()
+    manager.general_funcs_bindings = {}
+    manager.event_queue = MidiEventQueue()
+    manager.event_listener = None
+    return manager
+
+
+def test_queue_keeps_order_across_the_ring_end():
+    queue = MidiEventQueue(capacity=4)
+    for i in range(3):
+        assert queue.push(NOTE_ON, i, 127)
+    assert [event[1] for event in queue.drain()] == [0, 1, 2]
+
+    # The next events wrap around the end of the slots
+    for i in range(3, 7):
+        assert queue.push(NOTE_ON, i, 127)
+    assert len(queue) == 4
+    assert [event[1] for event in queue.drain()] == [3, 4, 5, 6]
+    assert len(queue) == 0
+
+
+def test_full_queue_drops_and_counts_new_events():
+    queue = MidiEventQueue(capacity=2)
+    assert queue.push(NOTE_ON, 0, 127)
+    assert queue.push(NOTE_ON, 1, 127)
+    assert not queue.push(NOTE_ON, 2, 127)
+    assert not queue.push(NOTE_ON, 3, 127)
+    assert queue.overflows == 2
+
+    # The oldest events are kept, and draining frees the slots
+    assert [event[1] for event in queue.drain()] == [0, 1]
+    assert queue.push(NOTE_ON, 4, 127)
+    assert [event[1] for event in queue.drain()] == [4]
+
+
+def test_scroller_and_knob_traffic_is_merged_after_clicks():
+    manager = make_manager()
+    calls = []
+    manager.bind_general_funcs(
+        Button.RIGHT_LOAD, lambda value: calls.append(("click", value))
+    )
+    manager.bind_general_funcs(
+        Button.SCROLL, lambda value: calls.append(("scroll", value))
+    )
+    manager.bind_general_funcs(
+        Button.LEFT_GAIN, lambda value: calls.append(("knob", value))
+    )
+
+    queue = manager.event_queue
+    queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_INC_VALUE)
+    queue.push(CONTROL_CHANGE, selector(Button.LEFT_GAIN), 10)
+    queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_INC_VALUE)
+    queue.push(NOTE_ON, selector(Button.RIGHT_LOAD), 127)
+    queue.push(NOTE_OFF, selector(Button.RIGHT_LOAD), 0)
+    queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_DEC_VALUE)
+    queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_INC_VALUE)
+    queue.push(CONTROL_CHANGE, selector(Button.LEFT_GAIN), 20)
+    manager.process_events()
+
+    # The click is applied in place, then the summed ticks and the last knob value
+    assert calls == [
+        ("click", 127),
+        ("scroll", MIDI_INC_VALUE),
+        ("scroll", MIDI_INC_VALUE),
+        ("knob", 20),
+    ]
+
+
+def test_scroller_ticks_that_cancel_out_are_not_applied():
+    manager = make_manager()
+    calls = []
+    manager.bind_general_funcs(Button.SCROLL, calls.append)
+
+    manager.event_queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_INC_VALUE)
+    manager.event_queue.push(CONTROL_CHANGE, selector(Button.SCROLL), MIDI_DEC_VALUE)
+    manager.process_events()
+
+    assert calls == []
+
+
+def test_failing_binding_does_not_stop_the_other_events():
+    manager = make_manager()
+    calls = []
+
+    def broken(value: int):
+        raise RuntimeError("broken binding")
+
+    manager.bind_general_funcs(Button.RIGHT_LOAD, broken)
+    manager.bind_general_funcs(Button.LEFT_LOAD, calls.append)
+
+    manager.event_queue.push(NOTE_ON, selector(Button.RIGHT_LOAD), 127)
+    manager.event_queue.push(NOTE_ON, selector(Button.LEFT_LOAD), 127)
+    manager.process_events()
+
+    assert calls == [127]
+
+
+if __name__ == "__main__":
+    tests = [
+        test_queue_keeps_order_across_the_ring_end,
+        test_full_queue_drops_and_counts_new_events,
+        test_scroller_and_knob_traffic_is_merged_after_clicks,
+        test_scroller_ticks_that_cancel_out_are_not_applied,
+        test_failing_binding_does_not_stop_the_other_events,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
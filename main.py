@@ -1,14 +1,24 @@
 import argparse
+import random
 import sys
 
 import moderngl_window as mglw
 
 mglw.settings.WINDOW["class"] = "moderngl_window.context.glfw.Window"
 
+from inputs.audio import AudioInput, open_audio_source
 from inputs.input_manager import MidiInputManager
 from top_level.global_context import GlobalCtx
 from top_level.screen import Screen
 from fakemidi.fakemidi import FakeMidi
+from scenes.shader_disk_cache import configure_driver_shader_cache
+from scenes.transition import (
+    DEFAULT_TRANSITION_DURATION,
+    DEFAULT_TRANSITION_RES_FACTOR,
+    TRANSITION_MODES,
+)
+from top_level.logger import setup_logging
+from top_level.recorder import DEFAULT_RECORD_FPS
 
 
 MIDI_INPUT_SUBNAME = "Mixage"
@@ -27,20 +37,133 @@ if __name__ == "__main__":
     parser.add_argument(
         "--start-scene", type=str, default=None, help="Name of the starting scene"
     )
+    parser.add_argument(
+        "--post-params-ubo",
+        action="store_true",
+        help="Upload post-processing params as a single std140 uniform block",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time the render spans of every frame (CPU and GPU)",
+    )
+    parser.add_argument(
+        "--profile-overlay",
+        action="store_true",
+        help="Draw a frame times graph over the output (implies --profile)",
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default=None,
+        help="Periodically write frame times to a .csv or JSON lines file (implies --profile)",
+    )
+    parser.add_argument(
+        "--target-fps",
+        type=float,
+        default=None,
+        help="Adapt the first pass resolution of the scenes to hold this frame rate",
+    )
+    parser.add_argument(
+        "--transition",
+        choices=list(TRANSITION_MODES),
+        default=None,
+        help="Blend scene changes instead of cutting",
+    )
+    parser.add_argument(
+        "--transition-duration",
+        type=float,
+        default=DEFAULT_TRANSITION_DURATION,
+        help="Duration of a scene transition in seconds",
+    )
+    parser.add_argument(
+        "--transition-res-factor",
+        type=float,
+        default=DEFAULT_TRANSITION_RES_FACTOR,
+        help="Scale of the first pass resolution of both scenes during a transition",
+    )
+    parser.add_argument(
+        "--hot-reload",
+        action="store_true",
+        help="Reload edited scene and shader files while running",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        metavar="PATH",
+        help="Record the output: a video file (encoded by ffmpeg), a .raw file or a .png sequence",
+    )
+    parser.add_argument(
+        "--record-fps",
+        type=float,
+        default=DEFAULT_RECORD_FPS,
+        help="Frame rate of the recorded video",
+    )
+    parser.add_argument(
+        "--record-midi",
+        default=None,
+        metavar="PATH",
+        help="Record the MIDI events of the show to a timeline, to re-render it with render_offline.py",
+    )
+    audio_group = parser.add_mutually_exclusive_group()
+    audio_group.add_argument(
+        "--audio-device",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="DEVICE",
+        help="Analyze the audio of a sound device (index or name, default input if omitted)",
+    )
+    audio_group.add_argument(
+        "--audio-wav",
+        default=None,
+        metavar="PATH",
+        help="Analyze a WAV file played in a loop, instead of a sound device",
+    )
     args, remaining = parser.parse_known_args()
 
+    setup_logging()
+
     # Initialize global context
     global_ctx = GlobalCtx()
     if args.fakemidi:
         global_ctx.fake_midi = FakeMidi()
     if args.start_scene:
         global_ctx.starting_scene_name = args.start_scene
+    global_ctx.is_post_params_ubo = args.post_params_ubo
+    global_ctx.is_profile_overlay = args.profile_overlay
+    global_ctx.profile_output = args.profile_output
+    global_ctx.target_fps = args.target_fps
+    global_ctx.transition_mode = args.transition
+    global_ctx.transition_duration = args.transition_duration
+    global_ctx.transition_res_factor = args.transition_res_factor
+    global_ctx.is_hot_reload = args.hot_reload
+    global_ctx.record_path = args.record
+    global_ctx.record_fps = args.record_fps
+    global_ctx.midi_record_path = args.record_midi
+    if args.record_midi:
+        # Replayed by the offline renderer so random scene changes are the same
+        global_ctx.random_seed = random.randrange(2**32)
+        random.seed(global_ctx.random_seed)
+    global_ctx.is_profiling = bool(
+        args.profile or args.profile_overlay or args.profile_output
+    )
 
     # Setup input manager
     fake_midi = global_ctx.fake_midi
     input_subname = fake_midi.output_name if fake_midi else MIDI_INPUT_SUBNAME
     input_manager = MidiInputManager(input_subname)
 
+    # Analyze the audio on its own thread from the start
+    if args.audio_wav or args.audio_device is not None:
+        global_ctx.audio_input = AudioInput(
+            open_audio_source(args.audio_wav, args.audio_device)
+        )
+        global_ctx.audio_input.start()
+
+    # Let the GL driver persist linked program binaries across restarts
+    configure_driver_shader_cache()
+
     # Update sys.argv to remove our custom arguments so moderngl_window can parse its own
     sys.argv = [sys.argv[0]] + remaining
 
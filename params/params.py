@@ -15,9 +15,20 @@ class Param:
     def value(self) -> float:
         return self.controller.value
 
+    @property
+    def version(self) -> int:
+        return self.controller.version
+
+    @property
+    def is_always_dirty(self) -> bool:
+        return self.controller.is_always_dirty
+
     @property
     def is_reset_on_scene_change(self) -> bool:
         return not self.controller.is_persistent
 
     def control_param(self, value: int | float):
         self.controller.control_value(value)
+
+    def control_ticks(self, ticks: int):
+        self.controller.control_ticks(ticks)
@@ -1,8 +1,7 @@
-import time
+import math
 from abc import ABC, abstractmethod
 from random import uniform
-from threading import Timer
-from typing import Any, Callable, Dict, Iterable, Tuple
+from typing import Any, Callable, Dict, Iterable, Tuple, TypeVar
 
 from inputs.buttons import ButtonType
 from inputs.midi import (
@@ -16,9 +15,16 @@ from inputs.midi import (
 from top_level.global_context import GlobalCtx
 
 
+# Audio features an AudioController can follow
+AUDIO_FEATURES = ("band", "rms", "beat")
+# Gain of an AudioController with its knob all the way up
+MAX_AUDIO_GAIN = 2.0
+
+
 controllers_registry: Dict[
     str, Tuple[type["ValueController"], frozenset[ButtonType]]
 ] = {}
+_ControllerClass = TypeVar("_ControllerClass", bound=type["ValueController"])
 
 
 def _normalize_supported_types(
@@ -35,8 +41,8 @@ def _normalize_supported_types(
 
 def register_controller(
     name: str, *supported_button_types: ButtonType
-) -> Callable[[type["ValueController"]], type["ValueController"]]:
-    def decorator(cls: type["ValueController"]) -> type["ValueController"]:
+) -> Callable[[_ControllerClass], _ControllerClass]:
+    def decorator(cls: _ControllerClass) -> _ControllerClass:
         controllers_registry[name] = (
             cls,
             _normalize_supported_types(name, supported_button_types),
@@ -47,15 +53,34 @@ def register_controller(
 
 
 class ValueController(ABC):
+    # Controllers whose value changes without any input (e.g. time based ones)
+    # must be uploaded every frame
+    is_always_dirty = False
+
     def __init__(self, initial_value=0.0, is_persistent=False):
         super().__init__()
         self.initial_value = initial_value
-        self.value = self.initial_value
+        self._value = self.initial_value
+        self._version = 0
         self.is_persistent = is_persistent
 
     def __repr__(self):
         return f"{self.__class__.__name__}({self.__dict__})"
 
+    @property
+    def value(self) -> Any:
+        return self._value
+
+    @value.setter
+    def value(self, new_value: Any):
+        self._value = new_value
+        self._version += 1
+
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever the value is set"""
+        return self._version
+
     def set_value(self, value: Any):
         self.value = value
 
@@ -63,10 +88,42 @@ class ValueController(ABC):
         """Reset the controller to its initial value"""
         self.value = self.initial_value
 
+    def adopt_value(self, previous: "ValueController") -> bool:
+        """
+        Take over the value of the controller this one replaces (e.g. when its
+        scene file is reloaded)
+
+        Args:
+            previous: The replaced controller
+
+        Returns:
+            True if the value was taken over
+        """
+        if type(previous) is not type(self):
+            return False
+
+        self.value = self._bounded(previous.value)
+        return True
+
+    def _bounded(self, value: Any) -> Any:
+        """The value, brought within the range of this controller"""
+        return value
+
     @abstractmethod
     def control_value(self, in_value: int):
         pass
 
+    def control_ticks(self, ticks: int):
+        """
+        Apply several scroller messages at once
+
+        Args:
+            ticks: Number of increment (positive) or decrement (negative) messages
+        """
+        in_value = MIDI_INC_VALUE if ticks > 0 else MIDI_DEC_VALUE
+        for _ in range(abs(ticks)):
+            self.control_value(in_value)
+
 
 class SharedValueController(ValueController):
     def __init__(self, shared_key: str, initial_value=0.0):
@@ -76,6 +133,7 @@ class SharedValueController(ValueController):
 
         if shared_key not in self.global_ctx.shared_values:
             self.global_ctx.shared_values[shared_key] = self.initial_value
+            self.global_ctx.shared_versions[shared_key] = 0
 
     @property
     def value(self) -> Any:
@@ -84,6 +142,17 @@ class SharedValueController(ValueController):
     @value.setter
     def value(self, new_value: Any):
         self.global_ctx.shared_values[self.shared_key] = new_value
+        self.global_ctx.shared_versions[self.shared_key] += 1
+
+    @property
+    def version(self) -> int:
+        return self.global_ctx.shared_versions[self.shared_key]
+
+    def adopt_value(self, previous: ValueController) -> bool:
+        # The value lives in the global context, under the same key
+        return isinstance(previous, SharedValueController) and (
+            previous.shared_key == self.shared_key
+        )
 
 
 @register_controller("NormalizedController", ButtonType.KNOB)
@@ -97,6 +166,10 @@ class NormalizedController(ValueController):
         self.max_input_value = MAX_PITCH if is_pitch else MIDI_MAX_VALUE
         self.min_input_value = MIN_PITCH if is_pitch else MIDI_MIN_VALUE
 
+    def _bounded(self, value: Any) -> Any:
+        low, high = sorted((self.min_value, self.max_value))
+        return max(low, min(high, value))
+
     def control_value(self, in_value: int):
         normalized_value = self.min_value + (in_value - self.min_input_value) * (
             self.max_value - self.min_value
@@ -111,6 +184,10 @@ class LinearSegmentedController(ValueController):
         self.segments_points = sorted(segments_points, key=lambda point: point[0])
         self.num_segments = len(self.segments_points) - 1
 
+    def _bounded(self, value: Any) -> Any:
+        outputs = [point[1] for point in self.segments_points]
+        return max(min(outputs), min(max(outputs), value))
+
     def control_value(self, in_value: int):
         segment_index = (
             next(
@@ -148,12 +225,15 @@ class IncDecController(ValueController):
         self.dec_value = dec_value
         self.step = step
 
+    def _bounded(self, value: Any) -> Any:
+        return max(self.min_value, min(self.max_value, value))
+
     @abstractmethod
-    def increase(self):
+    def increase(self, times: int = 1):
         pass
 
     @abstractmethod
-    def decrease(self):
+    def decrease(self, times: int = 1):
         pass
 
     def control_value(self, in_value: int):
@@ -162,31 +242,43 @@ class IncDecController(ValueController):
         elif in_value == self.dec_value:
             self.decrease()
 
+    def control_ticks(self, ticks: int):
+        in_value = MIDI_INC_VALUE if ticks > 0 else MIDI_DEC_VALUE
+        if in_value == self.inc_value:
+            self.increase(abs(ticks))
+        elif in_value == self.dec_value:
+            self.decrease(abs(ticks))
+
 
 @register_controller("RangedController", ButtonType.SCROLLER)
 class RangedController(IncDecController):
-    def increase(self):
-        self.value = max(min(self.value + self.step, self.max_value), self.min_value)
+    def increase(self, times: int = 1):
+        self.value = max(
+            min(self.value + self.step * times, self.max_value), self.min_value
+        )
 
-    def decrease(self):
-        self.value = min(max(self.value - self.step, self.min_value), self.max_value)
+    def decrease(self, times: int = 1):
+        self.value = min(
+            max(self.value - self.step * times, self.min_value), self.max_value
+        )
 
 
 @register_controller("CyclicController", ButtonType.SCROLLER)
 class CyclicController(IncDecController):
-    def increase(self):
-        self.value += self.step
-        if self.value > self.max_value:
-            self.value = self.min_value + (self.value - self.max_value)
-        if self.value < self.min_value:
-            self.value = self.max_value - (self.min_value - self.value)
+    def _wrap(self, value: float) -> float:
+        span = self.max_value - self.min_value
+        if span > 0 and not self.min_value <= value <= self.max_value:
+            value = self.min_value + (value - self.min_value) % span
+        return value
+
+    def _bounded(self, value: Any) -> Any:
+        return self._wrap(value)
 
-    def decrease(self):
-        self.value -= self.step
-        if self.value > self.max_value:
-            self.value = self.min_value + (self.value - self.max_value)
-        if self.value < self.min_value:
-            self.value = self.max_value - (self.min_value - self.value)
+    def increase(self, times: int = 1):
+        self.value = self._wrap(self.value + self.step * times)
+
+    def decrease(self, times: int = 1):
+        self.value = self._wrap(self.value - self.step * times)
 
 
 @register_controller("ToggleController", ButtonType.CLICKABLE)
@@ -215,33 +307,172 @@ class TimerToggleController(ValueController):
 
         self.min_time_to_reset = min_time_to_reset
         self.max_time_to_reset = max_time_to_reset
+        self.scheduler = GlobalCtx().scheduler
+        self._reset_call = None
+
+    def reset(self):
+        if self._reset_call is not None:
+            self._reset_call.cancel()
+            self._reset_call = None
+        super().reset()
 
     def control_value(self, in_value: int):
         if in_value == MIDI_MAX_VALUE and not self.value:
             self.set_value(True)
             time_to_reset = uniform(self.min_time_to_reset, self.max_time_to_reset)
-            Timer(time_to_reset, self.reset).start()
+            self._reset_call = self.scheduler.call_later(time_to_reset, self.reset)
+
+    def adopt_value(self, previous: ValueController) -> bool:
+        if not isinstance(previous, TimerToggleController):
+            return False
+
+        self.value = previous.value
+        previous_call = previous._reset_call
+        if previous_call is not None and not previous_call.is_cancelled:
+            # Take over the pending reset
+            previous_call.cancel()
+            self._reset_call = self.scheduler.call_at(previous_call.time, self.reset)
+        return True
 
 
 @register_controller("StartTimeController", ButtonType.CLICKABLE)
 class StartTimeController(ValueController):
+    is_always_dirty = True
+
     def __init__(self):
         super().__init__()
         self.click_start_time = None
+        self.scheduler = GlobalCtx().scheduler
 
     def control_value(self, in_value: int):
         if in_value == MIDI_MAX_VALUE:
-            self.click_start_time = time.time()
+            self.click_start_time = self.scheduler.now
 
         elif in_value == MIDI_MIN_VALUE:
             self.click_start_time = None
-            
+
+    def adopt_value(self, previous: ValueController) -> bool:
+        if not isinstance(previous, StartTimeController):
+            return False
+
+        self.click_start_time = previous.click_start_time
+        return True
+
     @property
     def value(self) -> float:
         if self.click_start_time is not None:
-            return time.time() - self.click_start_time
+            return self.scheduler.now - self.click_start_time
         return -1.0
 
     @value.setter
     def value(self, new_value: Any):
         pass
+
+
+@register_controller("AudioController", ButtonType.KNOB)
+class AudioController(ValueController):
+    """
+    Maps an audio feature (band level, RMS or beat envelope) from 0-1 to
+    [min_value, max_value], with attack/release smoothing. The knob sets the
+    gain applied to the feature.
+
+    The latest audio frame is read without locking, and the smoothing only runs
+    when a new frame arrived, so a frame costs a reference and an index compare.
+    """
+
+    def __init__(
+        self,
+        feature: str = "band",
+        bands: Iterable[int] = (0, 3),
+        min_value: float = 0.0,
+        max_value: float = 1.0,
+        attack: float = 0.01,
+        release: float = 0.25,
+        gain: float = 1.0,
+    ):
+        """
+        Args:
+            feature: One of AUDIO_FEATURES
+            bands: First and last band averaged by the "band" feature
+            min_value: Value for a silent feature
+            max_value: Value for a feature at 1
+            attack: Seconds to follow a rising feature
+            release: Seconds to follow a falling feature
+            gain: Initial gain, until the knob is turned
+        """
+        if feature not in AUDIO_FEATURES:
+            raise ValueError(
+                f"Unknown audio feature '{feature}', expected one of {', '.join(AUDIO_FEATURES)}."
+            )
+
+        super().__init__(initial_value=min_value, is_persistent=True)
+        self.feature = feature
+        first_band, last_band = bands
+        self.band_slice = slice(first_band, last_band + 1)
+        self.min_value = min_value
+        self.max_value = max_value
+        self.attack = attack
+        self.release = release
+        self.initial_gain = gain
+        self.gain = gain
+        self.level = 0.0
+        self.global_ctx = GlobalCtx()
+        self._frame = None
+
+    @property
+    def version(self) -> int:
+        audio_input = self.global_ctx.audio_input
+        frame = audio_input.latest if audio_input is not None else None
+        if frame is not None and frame is not self._frame:
+            self._follow(frame)
+        return self._version
+
+    @property
+    def value(self) -> float:
+        level = min(1.0, self.level * self.gain)
+        return self.min_value + (self.max_value - self.min_value) * level
+
+    @value.setter
+    def value(self, new_value: Any):
+        # Only reset() sets the value: back to silence
+        self.level = 0.0
+        self._version += 1
+
+    def reset(self):
+        self.gain = self.initial_gain
+        super().reset()
+
+    def adopt_value(self, previous: ValueController) -> bool:
+        if not isinstance(previous, AudioController):
+            return False
+
+        self.gain = previous.gain
+        self.level = previous.level
+        self._frame = previous._frame
+        self._version += 1
+        return True
+
+    def control_value(self, in_value: int):
+        self.gain = MAX_AUDIO_GAIN * (in_value - MIDI_MIN_VALUE) / (
+            MIDI_MAX_VALUE - MIDI_MIN_VALUE
+        )
+        self._version += 1
+
+    def _feature(self, frame) -> float:
+        if self.feature == "band":
+            return float(frame.bands[self.band_slice].mean())
+        if self.feature == "rms":
+            return frame.rms
+        return frame.beat
+
+    def _follow(self, frame):
+        """Move the level towards the feature of a new frame"""
+        elapsed = frame.time - self._frame.time if self._frame is not None else 0.0
+        self._frame = frame
+        target = self._feature(frame)
+        time_constant = self.attack if target > self.level else self.release
+        if time_constant <= 0 or elapsed <= 0:
+            self.level = target
+        else:
+            self.level += (target - self.level) * (1.0 - math.exp(-elapsed / time_constant))
+        self._version += 1
@@ -0,0 +1,107 @@
+import argparse
+import random
+import time
+
+import pyglet
+
+# No window is opened, keep pyglet (used by the fake MIDI key map) off the display
+pyglet.options["headless"] = True
+
+from benchmark import create_headless_context, parse_resolution
+from inputs.input_manager import MidiInputManager
+from inputs.midi_timeline import MidiTimeline
+from scenes.scenes_manager import ScenesManager
+from top_level.clock import VirtualClock
+from top_level.global_context import GlobalCtx
+from top_level.logger import get_logger, setup_logging
+from top_level.recorder import Recorder
+
+
+# Frames rendered after the last recorded event when no duration is given
+DEFAULT_TAIL_SECONDS = 2.0
+PROGRESS_INTERVAL = 5.0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="SynMix - Re-render a show from its recorded MIDI timeline"
+    )
+    parser.add_argument("timeline", help="Timeline written by main.py --record-midi")
+    parser.add_argument(
+        "--output",
+        required=True,
+        help="A video file (encoded by ffmpeg), a .raw file or a .png sequence",
+    )
+    parser.add_argument(
+        "--resolution", type=parse_resolution, default=(1920, 1080), help="e.g. 3840x2160"
+    )
+    parser.add_argument("--fps", type=float, default=60.0, help="Frames per second of show time")
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="Seconds of show time to render (default: up to the last event, plus a little)",
+    )
+    parser.add_argument("--backend", default=None, help="moderngl standalone backend (e.g. egl)")
+    args = parser.parse_args()
+
+    setup_logging()
+    timeline = MidiTimeline.load(args.timeline)
+
+    # Same random choices and time based controllers driven by the frames
+    global_ctx = GlobalCtx()
+    clock = VirtualClock()
+    global_ctx.scheduler.clock = clock
+    if timeline.header.get("seed") is not None:
+        random.seed(timeline.header["seed"])
+
+    ctx = create_headless_context(args.backend)
+    MidiInputManager(None)
+    sm = ScenesManager(ctx, starting_scene_name=timeline.header.get("start_scene"))
+    transition = timeline.header.get("transition")
+    if transition:
+        sm.enable_transitions(
+            transition["mode"], transition["duration"], transition["res_factor"]
+        )
+    sm.enable_midi_playback(timeline)
+
+    width, height = args.resolution
+    texture = ctx.texture((width, height), 4)
+    target = ctx.framebuffer([texture])
+    recorder = Recorder(ctx, args.output, (width, height), fps=args.fps, is_lossless=True)
+
+    duration = (
+        args.duration if args.duration is not None else timeline.duration + DEFAULT_TAIL_SECONDS
+    )
+    frame_count = int(duration * args.fps)
+    frame_time = 1.0 / args.fps
+    start = last_report = time.perf_counter()
+    for frame in range(frame_count):
+        show_time = frame * frame_time
+        clock.set(show_time)
+        sm.render(show_time, frame_time, (width, height, 1.0), target=target)
+        recorder.capture(target, (width, height))
+
+        now = time.perf_counter()
+        if now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            get_logger().info(
+                "Frame %d/%d (%.2fx real time)",
+                frame + 1,
+                frame_count,
+                show_time / (now - start),
+            )
+
+    recorder.close()
+    sm.close()
+    elapsed = time.perf_counter() - start
+    get_logger().info(
+        "Rendered %.1f s of show in %.1f s (%.2fx real time)",
+        duration,
+        elapsed,
+        duration / elapsed if elapsed else 0.0,
+    )
+
+
+if __name__ == "__main__":
+    main()
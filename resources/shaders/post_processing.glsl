@@ -7,11 +7,37 @@ out vec4 fragColor;
 uniform sampler2D uTexture;
 uniform sampler2D uTexture_tv_error;
 
+// Profiler overlay: frame times history (r: CPU ms, g: GPU ms), a texel per frame
+uniform sampler2D uTexture_profiler_overlay;
+uniform bool uShowProfilerOverlay;
+uniform int uProfilerOverlayHead;
+uniform float uProfilerOverlayBudget;
+
 // Screen resolution
 uniform vec3 iResolution;
 uniform float iTime;
 
 // Post-processing effect parameters
+// POST_PARAMS_UBO is defined by the application to upload them as one std140 block
+#ifdef POST_PARAMS_UBO
+layout(std140) uniform PostParams {
+    bool uInvertColors;
+    bool uInvertRed;
+    bool uInvertGreen;
+    bool uInvertBlue;
+    bool uInvertHue;
+    bool uInvertSaturation;
+    bool uInvertValue;
+    bool uTvError;
+
+    float uWavesX;
+    float uWavesY;
+
+    bool uIsDisplayDVDLogo;
+    float uFractTime;
+    bool uFractStatic;
+};
+#else
 uniform bool uInvertColors;
 uniform bool uInvertRed;
 uniform bool uInvertGreen;
@@ -27,6 +53,7 @@ uniform float uWavesY;
 uniform bool uIsDisplayDVDLogo;
 uniform float uFractTime;
 uniform bool uFractStatic;
+#endif
 
 #define PI 3.14159265359
 
@@ -271,6 +298,33 @@ vec4 DVDFragShader(vec2 fragCoord, vec3 iResolution, float iTime)
 }
 //=============<\DVD>===============
 
+// Frame times bar graph in the bottom left corner, oldest frame on the left.
+// The graph height is two frame budgets, the red line is one budget.
+vec4 applyProfilerOverlay(vec4 color, vec2 fragCoord) {
+    vec2 graphSize = vec2(256.0, 96.0);
+    vec2 p = (fragCoord - vec2(8.0)) / graphSize;
+    if (any(lessThan(p, vec2(0.0))) || any(greaterThan(p, vec2(1.0)))) {
+        return color;
+    }
+
+    int history = textureSize(uTexture_profiler_overlay, 0).x;
+    int column = (uProfilerOverlayHead + 1 + int(p.x * float(history))) % history;
+    vec2 times = texelFetch(uTexture_profiler_overlay, ivec2(column, 0), 0).rg
+        / (2.0 * uProfilerOverlayBudget);
+
+    vec3 graph = color.rgb * 0.3;
+    if (p.y < times.y) {
+        graph = vec3(0.2, 0.8, 0.3);
+    }
+    if (abs(p.y - times.x) * graphSize.y < 1.0) {
+        graph = vec3(0.3, 0.6, 1.0);
+    }
+    if (abs(p.y - 0.5) * graphSize.y < 0.5) {
+        graph = vec3(1.0, 0.2, 0.2);
+    }
+    return vec4(graph, 1.0);
+}
+
 vec2 applyFract(vec2 uv, float scale) {
     uv *= scale;
     uv = fract(uv);
@@ -335,4 +389,8 @@ void main() {
     } else {
         fragColor = color;
     }
+
+    if (uShowProfilerOverlay) {
+        fragColor = applyProfilerOverlay(fragColor, fragCoord);
+    }
 }
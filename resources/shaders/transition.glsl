@@ -0,0 +1,49 @@
+#version 330
+
+in vec2 fragCoord;
+out vec4 fragColor;
+
+// First pass outputs of the outgoing and incoming scenes
+uniform sampler2D uTexture_transition_from;
+uniform sampler2D uTexture_transition_to;
+
+uniform vec3 iResolution;
+
+// 0 to 1 over the transition
+uniform float uProgress;
+// 0: crossfade, 1: wipe, 2: dissolve
+uniform int uTransitionMode;
+
+#define TRANSITION_CROSSFADE 0
+#define TRANSITION_WIPE 1
+#define TRANSITION_DISSOLVE 2
+
+#define WIPE_EDGE 0.08
+#define DISSOLVE_EDGE 0.05
+#define DISSOLVE_CELL 4.0
+
+float hash12(vec2 p) { // @Dave_Hoskins : https://www.shadertoy.com/view/4djSRW
+    vec3 p3 = fract(vec3(p.xyx) * .1031);
+    p3 += dot(p3, p3.yzx + 33.33);
+    return fract((p3.x + p3.y) * p3.z);
+}
+
+void main() {
+    vec2 uv = fragCoord.xy / iResolution.xy;
+    vec4 from = texture(uTexture_transition_from, uv);
+    vec4 to = texture(uTexture_transition_to, uv);
+
+    float blend = uProgress;
+    if (uTransitionMode == TRANSITION_WIPE) {
+        // Soft edge moving left to right, fully off screen at both ends
+        float edge = uProgress * (1.0 + WIPE_EDGE);
+        blend = 1.0 - smoothstep(edge - WIPE_EDGE, edge, uv.x);
+    } else if (uTransitionMode == TRANSITION_DISSOLVE) {
+        // Blocks switch at random thresholds
+        float threshold = hash12(floor(fragCoord / DISSOLVE_CELL));
+        float edge = uProgress * (1.0 + DISSOLVE_EDGE);
+        blend = 1.0 - smoothstep(edge - DISSOLVE_EDGE, edge, threshold);
+    }
+
+    fragColor = mix(from, to, blend);
+}
@@ -0,0 +1,124 @@
+import math
+from typing import Optional
+
+from top_level.logger import get_logger
+
+
+# Resolution factors are multiples of this step, so FBO sizes repeat
+RES_FACTOR_STEP = 0.05
+DEFAULT_MIN_RES_FACTOR = 0.25
+DEFAULT_MAX_RES_FACTOR = 1.0
+
+# GPU time bounds, as fractions of the frame budget
+DOWNSCALE_THRESHOLD = 0.95
+UPSCALE_THRESHOLD = 0.7
+# Consecutive frames out of bounds before the resolution factor changes
+DOWNSCALE_FRAMES = 8
+UPSCALE_FRAMES = 90
+# Frames ignored after a change, until the GPU times reflect the new size
+SETTLE_FRAMES = 6
+GPU_TIME_SMOOTHING = 0.2
+
+
+def quantize_res_factor(res_factor: float) -> float:
+    return round(round(res_factor / RES_FACTOR_STEP) * RES_FACTOR_STEP, 4)
+
+
+class AdaptiveResolution:
+    """
+    Scales the first pass resolution to hold its GPU time under the budget of
+    a target frame rate.
+
+    The factor is lowered after DOWNSCALE_FRAMES frames over the budget, in
+    proportion to the overshoot, and raised a step at a time after
+    UPSCALE_FRAMES frames well under it, so the FBO is only reallocated when
+    the load actually changed.
+    """
+
+    def __init__(self, target_fps: float):
+        self.target_fps = target_fps
+        self.budget_ms = 1000.0 / target_fps
+        self.res_factor = 1.0
+        self.min_res_factor = DEFAULT_MIN_RES_FACTOR
+        self.max_res_factor = DEFAULT_MAX_RES_FACTOR
+        self._gpu_ms: Optional[float] = None
+        self._last_frame = -1
+        self._frames_over = 0
+        self._frames_under = 0
+        self._settle_frames = 0
+
+    @staticmethod
+    def start_res_factor(scene) -> float:
+        """The scene's res_factor, within its bounds"""
+        start = scene.res_factor if scene.res_factor is not None else scene.max_res_factor
+        return max(
+            scene.min_res_factor, min(scene.max_res_factor, quantize_res_factor(start))
+        )
+
+    def reset(self, scene):
+        """Start from the scene's res_factor, within its bounds"""
+        self.min_res_factor = scene.min_res_factor
+        self.max_res_factor = scene.max_res_factor
+        self.res_factor = self.start_res_factor(scene)
+        self._restart_measurement()
+
+    def update(self, frame_index: int, gpu_ms: float):
+        """
+        Args:
+            frame_index: Index of the frame the GPU time was measured on
+            gpu_ms: First pass GPU time of that frame in ms
+        """
+        if frame_index == self._last_frame:
+            return
+        self._last_frame = frame_index
+
+        if self._settle_frames > 0:
+            self._settle_frames -= 1
+            return
+
+        if self._gpu_ms is None:
+            self._gpu_ms = gpu_ms
+        else:
+            self._gpu_ms += GPU_TIME_SMOOTHING * (gpu_ms - self._gpu_ms)
+
+        if self._gpu_ms > self.budget_ms * DOWNSCALE_THRESHOLD:
+            self._frames_over += 1
+            self._frames_under = 0
+        elif self._gpu_ms < self.budget_ms * UPSCALE_THRESHOLD:
+            self._frames_under += 1
+            self._frames_over = 0
+        else:
+            self._frames_over = self._frames_under = 0
+
+        if self._frames_over >= DOWNSCALE_FRAMES:
+            # The first pass cost is proportional to its area
+            scale = math.sqrt(self.budget_ms * UPSCALE_THRESHOLD / self._gpu_ms)
+            self._set_res_factor(
+                min(
+                    quantize_res_factor(self.res_factor * scale),
+                    self.res_factor - RES_FACTOR_STEP,
+                )
+            )
+        elif self._frames_under >= UPSCALE_FRAMES:
+            self._set_res_factor(self.res_factor + RES_FACTOR_STEP)
+
+    def _set_res_factor(self, res_factor: float):
+        res_factor = self._clamp(quantize_res_factor(res_factor))
+        if res_factor != self.res_factor:
+            get_logger().info(
+                "Resolution factor %.2f -> %.2f (GPU %.1f ms, budget %.1f ms)",
+                self.res_factor,
+                res_factor,
+                self._gpu_ms,
+                self.budget_ms,
+            )
+            self.res_factor = res_factor
+        self._restart_measurement()
+
+    def _restart_measurement(self):
+        self._gpu_ms = None
+        self._frames_over = self._frames_under = 0
+        self._settle_frames = SETTLE_FRAMES
+
+    def _clamp(self, res_factor: float) -> float:
+        return max(self.min_res_factor, min(self.max_res_factor, res_factor))
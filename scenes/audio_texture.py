@@ -0,0 +1,46 @@
+from typing import Optional
+
+from inputs.audio_analysis import AudioFrame
+from scenes.texture_registry import TextureRegistry
+
+
+# Sampler of the band levels: `uniform sampler2D iAudioBands;`, sampled along x
+AUDIO_BANDS_TEXTURE = "iAudioBands"
+# Per-frame float uniforms of the audio analysis
+AUDIO_BEAT_UNIFORM = "iBeat"
+AUDIO_LEVEL_UNIFORM = "iAudioLevel"
+
+
+class AudioTexture:
+    """
+    Band levels of the latest audio frame in a band_count x 1 float texture.
+
+    Two textures are written in turn, so a new frame never overwrites the
+    texture the GPU may still be reading for the previous frame. The registry
+    swaps the written one into the AUDIO_BANDS_TEXTURE unit.
+    """
+
+    def __init__(self, screen_ctx, texture_registry: TextureRegistry, band_count: int):
+        self.texture_registry = texture_registry
+        self._textures = [
+            screen_ctx.texture((band_count, 1), 1, dtype="f4") for _ in range(2)
+        ]
+        for texture in self._textures:
+            texture.filter = (screen_ctx.LINEAR, screen_ctx.LINEAR)
+            texture.repeat_x = False
+            texture.repeat_y = False
+            texture.write(bytes(band_count * 4))
+        self._front = 0
+        self._frame_index: Optional[int] = None
+        texture_registry.register(AUDIO_BANDS_TEXTURE, self._textures[0])
+
+    def update(self, frame: AudioFrame):
+        """Write the bands of a frame, if it is a new one"""
+        if frame.block_index == self._frame_index:
+            return
+
+        self._frame_index = frame.block_index
+        self._front = 1 - self._front
+        texture = self._textures[self._front]
+        texture.write(frame.bands)
+        self.texture_registry.register(AUDIO_BANDS_TEXTURE, texture)
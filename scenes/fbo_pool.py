@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+
+# Memory of idle framebuffers kept for reuse
+DEFAULT_POOL_MAX_BYTES = 256 * 1024 * 1024
+DTYPE_SIZES = {"f1": 1, "f2": 2, "f4": 4, "u1": 1, "u2": 2, "u4": 4, "i1": 1, "i2": 2, "i4": 4}
+
+FramebufferKey = Tuple[int, int, int, str]
+
+
+class FramebufferPool:
+    """
+    Framebuffers with a single color texture, reused by (width, height,
+    components, dtype) instead of being reallocated on every size change.
+
+    Released framebuffers stay idle in the pool and the least recently released
+    ones are freed once the idle memory exceeds max_bytes.
+    """
+
+    def __init__(self, screen_ctx, max_bytes: int = DEFAULT_POOL_MAX_BYTES):
+        self.screen_ctx = screen_ctx
+        self.max_bytes = max_bytes
+        # Idle framebuffers by key, least recently released first
+        self._idle: OrderedDict[FramebufferKey, List] = OrderedDict()
+        self._keys: Dict[int, FramebufferKey] = {}
+        self.idle_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of idle framebuffers"""
+        return sum(len(fbos) for fbos in self._idle.values())
+
+    @staticmethod
+    def size_in_bytes(key: FramebufferKey) -> int:
+        width, height, components, dtype = key
+        return width * height * components * DTYPE_SIZES[dtype]
+
+    def acquire(self, size: Tuple[int, int], components: int = 4, dtype: str = "f1"):
+        """
+        Get a framebuffer of the given format, from the pool when one is idle
+
+        Returns:
+            The framebuffer, its texture is color_attachments[0]
+        """
+        key = (int(size[0]), int(size[1]), components, dtype)
+        idle_fbos = self._idle.get(key)
+        if idle_fbos:
+            fbo = idle_fbos.pop()
+            if not idle_fbos:
+                del self._idle[key]
+            self.idle_bytes -= self.size_in_bytes(key)
+            self.hits += 1
+            return fbo
+
+        self.misses += 1
+        texture = self.screen_ctx.texture(key[:2], components, dtype=dtype)
+        texture.filter = (self.screen_ctx.LINEAR, self.screen_ctx.LINEAR)
+        fbo = self.screen_ctx.framebuffer([texture])
+        self._keys[fbo.glo] = key
+        return fbo
+
+    def release(self, fbo):
+        """Return an acquired framebuffer to the pool"""
+        key = self._keys[fbo.glo]
+        self._idle.setdefault(key, []).append(fbo)
+        self._idle.move_to_end(key)
+        self.idle_bytes += self.size_in_bytes(key)
+        self._evict()
+
+    def release_all(self):
+        """Free the idle framebuffers"""
+        for key, fbos in self._idle.items():
+            for fbo in fbos:
+                self._free(fbo)
+        self._idle.clear()
+        self.idle_bytes = 0
+
+    def _evict(self):
+        while self.idle_bytes > self.max_bytes and self._idle:
+            key, fbos = next(iter(self._idle.items()))
+            self._free(fbos.pop(0))
+            if not fbos:
+                del self._idle[key]
+            self.idle_bytes -= self.size_in_bytes(key)
+
+    def _free(self, fbo):
+        del self._keys[fbo.glo]
+        for texture in fbo.color_attachments:
+            texture.release()
+        fbo.release()
@@ -0,0 +1,197 @@
+import os
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from params.params import Param
+from scenes.scene import Scene
+from scenes.scene_library import SceneLibrary
+from top_level.logger import get_logger
+
+
+HOT_RELOAD_POLL_INTERVAL = 0.5
+WATCHED_SUFFIXES = (".toml", ".glsl")
+
+# Programs a reload job is for
+RELOAD_SCENE = "scene"
+RELOAD_POST = "post"
+RELOAD_TRANSITION = "transition"
+
+
+class ReloadJob(NamedTuple):
+    kind: str
+    vertex_source: str
+    fragment_source: str
+    # Scene jobs: index of the scene in the library, and the scene to compile the
+    # program of (a new Scene object when its file was edited)
+    scene_index: Optional[int] = None
+    scene: Optional[Scene] = None
+    # Post jobs: the params reloaded from the post-processing params file
+    post_params: Optional[List[Param]] = None
+
+    @property
+    def description(self) -> str:
+        if self.kind == RELOAD_SCENE and self.scene is not None:
+            return f"scene {self.scene.name}"
+        return f"{self.kind} shader"
+
+
+class FileWatcher:
+    """
+    Polls the modification time and size of the files in directories.
+
+    A change is reported once the file stayed the same for a whole poll, so a
+    file still being written by an editor is not read half-way.
+    """
+
+    def __init__(
+        self, directories: Iterable[Path], suffixes: Tuple[str, ...] = WATCHED_SUFFIXES
+    ):
+        self.directories = list(directories)
+        self.suffixes = suffixes
+        self._stats = self._scan()
+        self._pending: Dict[Path, tuple] = {}
+
+    def poll(self) -> List[Path]:
+        """
+        Returns:
+            The files that changed (or appeared) and settled since the last poll
+        """
+        stats = self._scan()
+        settled = []
+        for path, stat in stats.items():
+            if self._stats.get(path) == stat:
+                self._pending.pop(path, None)
+                continue
+            if self._pending.get(path) == stat:
+                del self._pending[path]
+                self._stats[path] = stat
+                settled.append(path)
+            else:
+                self._pending[path] = stat
+
+        return settled
+
+    def _scan(self) -> Dict[Path, tuple]:
+        stats = {}
+        for directory in self.directories:
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.endswith(self.suffixes):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    stats[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+
+class HotReloader:
+    """
+    Watches the scene and shader files from a background thread, which reads and
+    parses the edited files into ReloadJobs.
+
+    The render thread only compiles and swaps the programs of the jobs, one per
+    frame, so a reload never parses TOML or reads files on a frame.
+    """
+
+    def __init__(
+        self,
+        library: SceneLibrary,
+        load_scene: Callable[[Path], Scene],
+        load_post_params: Callable[[], List[Param]],
+        scenes_dir: Path,
+        shaders_dir: Path,
+        post_params_file: Path,
+        program_files: Dict[str, Tuple[str, str]],
+        interval: float = HOT_RELOAD_POLL_INTERVAL,
+    ):
+        """
+        Args:
+            library: The scenes, whose files and shaders are watched
+            load_scene: Builds the Scene of a file
+            load_post_params: Loads the post-processing params
+            scenes_dir: Directory of the scene files
+            shaders_dir: Directory of the shader files
+            post_params_file: The post-processing params file
+            program_files: (vertex, fragment) shader file names of the
+                RELOAD_POST and RELOAD_TRANSITION programs
+            interval: Seconds between two polls of the files
+        """
+        self.library = library
+        self.load_scene = load_scene
+        self.load_post_params = load_post_params
+        self.shaders_dir = shaders_dir
+        self.post_params_file = post_params_file
+        self.program_files = program_files
+        self.interval = interval
+        self.watcher = FileWatcher([scenes_dir, shaders_dir])
+        self._jobs: queue.SimpleQueue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="hot-reload", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def next_job(self) -> Optional[ReloadJob]:
+        try:
+            return self._jobs.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            for path in self.watcher.poll():
+                get_logger().info("%s changed", path.name)
+                try:
+                    self._prepare(path)
+                except Exception as e:
+                    get_logger().error("Failed to reload %s: %s", path.name, e)
+
+    def _prepare(self, path: Path):
+        """Queue the jobs of the programs affected by a changed file"""
+        if path.suffix == ".toml":
+            if path.name == self.post_params_file.name:
+                self._put_program_job(RELOAD_POST, post_params=self.load_post_params())
+                return
+
+            scene_names = [scene_path.name for scene_path in self.library.paths]
+            if path.name not in scene_names:
+                get_logger().warning(
+                    "New scene file %s is loaded on the next start", path.name
+                )
+                return
+
+            scene = self.load_scene(path)
+            self._put_scene_job(scene_names.index(path.name), scene)
+            return
+
+        for kind, file_names in self.program_files.items():
+            if path.name in file_names:
+                self._put_program_job(kind)
+
+        # Scenes not loaded yet read their shaders when they are
+        for scene_index, scene in self.library.loaded():
+            if path.name in (scene.vertex_shader_filename, scene.fragment_shader_filename):
+                self._put_scene_job(scene_index, scene)
+
+    def _put_scene_job(self, scene_index: int, scene: Scene):
+        vertex_source, fragment_source = scene.get_shaders()
+        self._jobs.put(
+            ReloadJob(RELOAD_SCENE, vertex_source, fragment_source, scene_index, scene)
+        )
+
+    def _put_program_job(self, kind: str, **kwargs):
+        vertex_file, fragment_file = self.program_files[kind]
+        vertex_source = (self.shaders_dir / vertex_file).read_text()
+        fragment_source = (self.shaders_dir / fragment_file).read_text()
+        self._jobs.put(ReloadJob(kind, vertex_source, fragment_source, **kwargs))
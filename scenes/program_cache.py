@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Iterable, Optional, Set
+
+from scenes.scene import Scene
+from scenes.shader_disk_cache import ShaderDiskCache
+from scenes.uniform_table import UniformTable
+from top_level.logger import get_logger
+
+
+DEFAULT_MAX_RESIDENT_PROGRAMS = 16
+
+
+class ProgramCache:
+    """
+    LRU cache of linked shader programs keyed by scene name.
+
+    Programs are compiled once and kept alive together with their uniform table,
+    so switching to a resident scene is a dictionary lookup instead of a GLSL
+    compile.
+    """
+
+    def __init__(
+        self,
+        screen_ctx,
+        max_resident: int = DEFAULT_MAX_RESIDENT_PROGRAMS,
+        disk_cache: Optional[ShaderDiskCache] = None,
+    ):
+        if max_resident < 1:
+            raise ValueError("Program cache must keep at least one program resident.")
+
+        self.screen_ctx = screen_ctx
+        self.disk_cache = disk_cache
+        self.max_resident = max_resident
+        self._tables: OrderedDict[str, UniformTable] = OrderedDict()
+        self._pinned_names: Set[str] = set()
+
+    def __contains__(self, scene_name: str) -> bool:
+        return scene_name in self._tables
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def compile(self, vertex_source: str, fragment_source: str, name: Optional[str] = None):
+        """
+        Compile and link a shader program
+
+        Args:
+            vertex_source: Vertex shader source code
+            fragment_source: Fragment shader source code
+            name: Name the program is recorded under in the disk cache
+
+        Returns:
+            The linked shader program
+        """
+        if self.disk_cache is not None:
+            return self.disk_cache.compile(vertex_source, fragment_source, name)
+
+        return self.screen_ctx.program(
+            vertex_shader=vertex_source, fragment_shader=fragment_source
+        )
+
+    def get(self, scene: Scene) -> UniformTable:
+        """
+        Return the program of a scene, compiling it on a cache miss
+
+        Args:
+            scene: The scene whose program is requested
+
+        Returns:
+            The uniform table of the scene's linked program
+        """
+        table = self._tables.get(scene.name)
+        if table is not None:
+            self._tables.move_to_end(scene.name)
+            return table
+
+        vertex_source, fragment_source = scene.get_shaders()
+        program = self.compile(vertex_source, fragment_source, scene.name)
+        table = UniformTable(program, scene.params)
+        self._tables[scene.name] = table
+        self._evict()
+        return table
+
+    def pin(self, scene: Scene, keep: Iterable[Scene] = ()) -> UniformTable:
+        """
+        Return the program of a scene and protect it from eviction
+
+        Only the scenes being rendered are pinned, the previous pins are dropped.
+
+        Args:
+            scene: The scene that becomes the rendered one
+            keep: Other scenes still rendered (e.g. the outgoing scene of a
+                transition)
+        """
+        self._pinned_names = {scene.name, *(kept.name for kept in keep)}
+        return self.get(scene)
+
+    def replace(self, name: str, scene: Scene, table: UniformTable):
+        """
+        Swap the program of a scene for a newly compiled one, releasing the old one
+
+        Args:
+            name: Name the scene's program was cached under
+            scene: The scene (possibly renamed)
+            table: Uniform table of the new program
+        """
+        previous = self._tables.pop(name, None)
+        if previous is not None and previous is not table:
+            previous.program.release()
+        if name in self._pinned_names:
+            self._pinned_names = (self._pinned_names - {name}) | {scene.name}
+        self._tables[scene.name] = table
+        self._evict()
+
+    def prewarm(self, scenes: Iterable[Scene]):
+        """
+        Compile the programs of the given scenes, up to the residency limit
+
+        Args:
+            scenes: Scenes in the order they should be compiled
+        """
+        for scene in scenes:
+            if len(self._tables) >= self.max_resident:
+                break
+            if scene.name not in self._tables:
+                get_logger().info("Compiling shaders of scene %s", scene.name)
+                self.get(scene)
+
+    def release_all(self):
+        """Release every resident program"""
+        for table in self._tables.values():
+            table.program.release()
+        self._tables.clear()
+        self._pinned_names = set()
+
+    def _evict(self):
+        """Release least recently used programs until under the residency limit"""
+        while len(self._tables) > self.max_resident:
+            victim_name = next(
+                (name for name in self._tables if name not in self._pinned_names), None
+            )
+            if victim_name is None:
+                return
+            self._tables.pop(victim_name).program.release()
@@ -0,0 +1,176 @@
+import json
+import re
+import threading
+import tomllib
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from scenes.scene import Scene
+from top_level.logger import get_logger
+
+
+# Top level `name = "..."` of a scene file, before its first table
+SCENE_NAME_PATTERN = re.compile(
+    r"""^\s*name\s*=\s*(?P<quote>["'])(?P<name>.*?)(?P=quote)\s*(?:#.*)?$""",
+    re.MULTILINE,
+)
+
+
+def read_scene_name(scene_file: Path) -> str:
+    """
+    Read the name of a scene without parsing the whole file
+
+    Args:
+        scene_file: Scene TOML file
+
+    Returns:
+        The scene name
+    """
+    text = scene_file.read_text()
+    header = re.split(r"^\s*\[", text, maxsplit=1, flags=re.MULTILINE)[0]
+    match = SCENE_NAME_PATTERN.search(header)
+    if match is not None:
+        return match.group("name")
+
+    # Unusual syntax (escapes, multiline strings...), let the TOML parser decide
+    return tomllib.loads(text)["name"]
+
+
+class SceneLibrary:
+    """
+    Ordered scenes, indexed by name at startup and materialized on first use.
+
+    Only the scene names are read when the library is created. A Scene (and its
+    params and controllers) is built from its file the first time it is
+    accessed, or earlier by the background prefetch thread.
+    """
+
+    def __init__(
+        self,
+        scene_files: Iterable[Path],
+        load_scene: Callable[[Path], Scene],
+        order_file: Optional[Path] = None,
+    ):
+        """
+        Args:
+            scene_files: Scene TOML files
+            load_scene: Builds the Scene of a file
+            order_file: JSON file with the preferred "scene_order" of names
+        """
+        self._load_scene = load_scene
+        self._lock = threading.Lock()
+        self._prefetch_thread: Optional[threading.Thread] = None
+
+        entries = [(read_scene_name(path), path) for path in scene_files]
+        if order_file is not None:
+            entries = self._reorder(entries, order_file)
+
+        self.names: List[str] = [name for name, _ in entries]
+        self.paths: List[Path] = [path for _, path in entries]
+        self._scenes: List[Optional[Scene]] = [None] * len(entries)
+
+    def __len__(self) -> int:
+        return len(self._scenes)
+
+    def __getitem__(self, index: int) -> Scene:
+        scene = self._scenes[index]
+        if scene is None:
+            scene = self._materialize(index)
+        return scene
+
+    def __iter__(self) -> Iterator[Scene]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __repr__(self):
+        return f"SceneLibrary({self.names})"
+
+    def index_of(self, name: str) -> int:
+        try:
+            return self.names.index(name)
+        except ValueError:
+            raise ValueError(
+                f"No scene named '{name}', available scenes: {', '.join(self.names)}"
+            ) from None
+
+    def is_loaded(self, index: int) -> bool:
+        return self._scenes[index] is not None
+
+    def loaded(self) -> List[tuple]:
+        """(index, scene) of the scenes materialized so far"""
+        return [
+            (index, scene) for index, scene in enumerate(self._scenes) if scene is not None
+        ]
+
+    def replace(self, index: int, scene: Scene):
+        """Swap the scene at an index for a new one (e.g. reloaded from its file)"""
+        with self._lock:
+            self._scenes[index] = scene
+            self.names[index] = scene.name
+
+    def start_prefetch(self, first_index: int = 0):
+        """
+        Materialize the remaining scenes in a background thread
+
+        Args:
+            first_index: Scenes are loaded in order starting from this index
+        """
+        if self._prefetch_thread is not None:
+            return
+
+        order = [(first_index + offset) % len(self) for offset in range(len(self))]
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch, args=(order,), name="scene-prefetch", daemon=True
+        )
+        self._prefetch_thread.start()
+
+    def _prefetch(self, order: List[int]):
+        for index in order:
+            if self._scenes[index] is not None:
+                continue
+            try:
+                self._materialize(index)
+            except Exception as e:
+                # Reported again when the scene is actually used
+                get_logger().error("Failed to prefetch scene %s: %s", self.names[index], e)
+
+    def _materialize(self, index: int) -> Scene:
+        with self._lock:
+            scene = self._scenes[index]
+            if scene is None:
+                scene = self._load_scene(self.paths[index])
+                if scene.name != self.names[index]:
+                    get_logger().warning(
+                        "Scene file %s was indexed as '%s' but is named '%s'",
+                        self.paths[index].name,
+                        self.names[index],
+                        scene.name,
+                    )
+                self._scenes[index] = scene
+            return scene
+
+    @staticmethod
+    def _reorder(entries: List[tuple], order_file: Path) -> List[tuple]:
+        """Reorder (name, path) entries according to the order specified in order_file"""
+        try:
+            with open(order_file, "r") as f:
+                config = json.load(f)
+
+            scene_order = config.get("scene_order", [])
+            if not scene_order:
+                return entries
+
+            # Scenes in the order list first, by order, then the others
+            positions = {name: position for position, name in enumerate(scene_order)}
+            ordered_entries = sorted(
+                entries, key=lambda entry: positions.get(entry[0], len(positions))
+            )
+            print(f"Scenes reordered according to {order_file.name}")
+            return ordered_entries
+
+        except FileNotFoundError:
+            print(f"Warning: {order_file} not found. Using default order.")
+        except (json.JSONDecodeError, KeyError) as e:
+            print(f"Warning: Error parsing {order_file}: {e}. Using default order.")
+
+        return entries
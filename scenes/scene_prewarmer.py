@@ -0,0 +1,107 @@
+from collections import deque
+from typing import Deque, Iterable, Iterator, Optional, Sequence, Tuple
+
+from scenes.fbo_pool import FramebufferPool
+from scenes.program_cache import ProgramCache
+from scenes.scene import Scene
+from scenes.texture_registry import TextureRegistry
+from top_level.logger import get_logger
+
+
+class ScenePrewarmer:
+    """
+    Prepares the scenes that may be switched to next, one scene per frame, so
+    the switch frame finds their program linked, its uniforms resolved, its
+    samplers bound and FBOs of the right sizes idle in the pool.
+
+    Frames without such a task compile the programs of the other scenes, while
+    the program cache has room for them.
+    """
+
+    def __init__(
+        self,
+        screen_ctx,
+        program_cache: ProgramCache,
+        fbo_pool: FramebufferPool,
+        texture_registry: TextureRegistry,
+        quad,
+        frame_uniforms: Iterable[str] = (),
+    ):
+        self.screen_ctx = screen_ctx
+        self.program_cache = program_cache
+        self.fbo_pool = fbo_pool
+        self.texture_registry = texture_registry
+        self.quad = quad
+        self.frame_uniforms = tuple(frame_uniforms)
+        self._tasks: Deque[Tuple[Scene, Sequence[Tuple[int, int]]]] = deque()
+        self._background: Optional[Iterator[Scene]] = None
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def schedule(self, targets: Iterable[Tuple[Scene, Sequence[Tuple[int, int]]]]):
+        """
+        Replace the pending tasks
+
+        Args:
+            targets: (scene, FBO sizes) pairs, most likely first. The sizes are
+                the FBOs used at once when switching to the scene, the first
+                one is the scene's first pass. A size listed twice gets two FBOs.
+        """
+        self._tasks.clear()
+        seen = set()
+        for scene, fbo_sizes in targets:
+            if scene.name not in seen:
+                seen.add(scene.name)
+                self._tasks.append((scene, fbo_sizes))
+
+    def compile_later(self, scenes: Iterable[Scene]):
+        """
+        Compile the programs of scenes on frames without scheduled tasks
+
+        Args:
+            scenes: Scenes in the order they should be compiled, consumed lazily
+        """
+        self._background = iter(scenes)
+
+    def run_one(self) -> bool:
+        """
+        Prepare the next scheduled scene, or compile the next background one
+
+        Returns:
+            True if a scene was prepared or compiled
+        """
+        if not self._tasks:
+            return self._compile_next()
+
+        scene, fbo_sizes = self._tasks.popleft()
+        table = self.program_cache.get(scene)
+        table.resolve(self.frame_uniforms)
+        self.texture_registry.add_program(table.program)
+
+        # Acquired together, so that sizes used at once get an FBO each
+        fbos = [self.fbo_pool.acquire(fbo_size) for fbo_size in fbo_sizes]
+        # Drivers finish compiling a program on its first draw, make it a single pixel
+        fbos[0].use()
+        self.screen_ctx.scissor = (0, 0, 1, 1)
+        self.quad.render(table.program)
+        self.screen_ctx.scissor = None
+        for fbo in fbos:
+            self.fbo_pool.release(fbo)
+        return True
+
+    def _compile_next(self) -> bool:
+        if self._background is None:
+            return False
+
+        cache = self.program_cache
+        for scene in self._background:
+            if len(cache) >= cache.max_resident:
+                break
+            if scene.name not in cache:
+                get_logger().info("Compiling shaders of scene %s", scene.name)
+                cache.get(scene)
+                return True
+
+        self._background = None
+        return False
@@ -1,25 +1,56 @@
 import tomllib
-import json
-from typing import Tuple, Dict
+from typing import Tuple
 import random
 from pprint import pprint
+from time import perf_counter
 
 import moderngl_window as mglw
 from pathlib import Path
+from inputs.audio import AudioInput
 from inputs.buttons import Button
 from inputs.input_manager import MidiInputManager
 from inputs.midi import MIDI_BUTTEN_CLICK
+from inputs.midi_timeline import MidiTimeline, MidiTimelineRecorder
 from params.params import Param
 from params.valuecontrollers import controllers_registry
-from scenes.scene import Scene, update_shader_params_from_list
+from scenes.adaptive_resolution import AdaptiveResolution
+from scenes.audio_texture import AUDIO_BEAT_UNIFORM, AUDIO_LEVEL_UNIFORM, AudioTexture
+from scenes.fbo_pool import FramebufferPool
+from scenes.hot_reload import (
+    RELOAD_POST,
+    RELOAD_SCENE,
+    RELOAD_TRANSITION,
+    HotReloader,
+    ReloadJob,
+)
+from scenes.program_cache import ProgramCache
+from scenes.scene import Scene
+from scenes.scene_library import SceneLibrary
+from scenes.scene_prewarmer import ScenePrewarmer
+from scenes.shader_disk_cache import ShaderDiskCache
+from scenes.texture_disk_cache import TextureDiskCache
+from scenes.texture_loader import TextureLoader
+from scenes.texture_registry import TextureRegistry
+from scenes.transition import (
+    DEFAULT_TRANSITION_DURATION,
+    DEFAULT_TRANSITION_RES_FACTOR,
+    TRANSITION_FROM_TEXTURE,
+    TRANSITION_MODES,
+    TRANSITION_TO_TEXTURE,
+    Transition,
+)
+from scenes.uniform_block import Std140UniformBlock, define_in_source
+from scenes.uniform_table import UniformTable
 from top_level.global_context import GlobalCtx
-
-try:
-    from PIL import Image
-    import numpy as np
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from top_level.logger import change_log, get_logger
+from top_level.profiler import (
+    GPU_SPANS,
+    NULL_PROFILER,
+    PROFILER_GPU_LATENCY,
+    FrameProfiler,
+    NullProfiler,
+    ProfilerOverlay,
+)
 
 
 RESOURCES_DIR = Path("resources")
@@ -28,36 +59,101 @@ SHADERS_DIR = RESOURCES_DIR / "shaders"
 TEXTURES_DIR = RESOURCES_DIR / "textures"
 SCENES_ORDER_FILE = RESOURCES_DIR / "scenes_order.json"
 POST_PROCESSING_PARAMS_FILE = SCENES_DIR / "post_processing_params.toml"
+VERTEX_SHADER_FILE = "vertex.glsl"
+POST_PROCESSING_SHADER_FILE = "post_processing.glsl"
+TRANSITION_SHADER_FILE = "transition.glsl"
+POST_PARAMS_UBO_DEFINE = "POST_PARAMS_UBO"
+POST_PARAMS_BLOCK_NAME = "PostParams"
+# Names of the non-scene programs in the shader disk cache
+POST_PROCESSING_PROGRAM = "post_processing"
+TRANSITION_PROGRAM = "transition"
+# Per-frame uniforms of the scene programs
+FRAME_UNIFORMS = ("iTime", "iResolution")
+# Frame budget without a target frame rate, e.g. drawn by the profiler overlay
+DEFAULT_FRAME_BUDGET_MS = 1000.0 / 60.0
+# A reload compile is deferred while the frame already used its budget, for at
+# most this many frames so that edits still show up under a steady load
+RELOAD_MAX_DEFERRED_FRAMES = 30
 
 
 class ScenesManager:
-    def __init__(self, screen_ctx, starting_scene_name: str = None):
-        self.scenes = []
+    def __init__(self, screen_ctx, starting_scene_name: str | None = None):
+        self.scenes = self._index_scene_files()
+        assert len(self.scenes) > 0, "No scenes are loaded."
         self.input_manager = MidiInputManager()
         self.screen_ctx = screen_ctx
         self.current_prog = None
+        self.current_uniforms = None
         self.post_prog = None
-        self.quad = None
+        self.post_uniforms = None
+        self.post_params_block = None
         self.fbo = None
         self.fbo_texture = None
         self.global_ctx = GlobalCtx()
-        self.textures: Dict[str, any] = {}  # Store loaded textures
-        self._load_scens_from_toml_files()
-        assert len(self.scenes) > 0, "No scenes are loaded."
+        self.texture_registry = TextureRegistry(screen_ctx)
+        self.texture_loader = TextureLoader(
+            screen_ctx,
+            self.texture_registry,
+            TEXTURES_DIR,
+            disk_cache=TextureDiskCache(),
+        )
+        self.fbo_pool = FramebufferPool(screen_ctx)
+        self.profiler: FrameProfiler | NullProfiler = NULL_PROFILER
+        self.profiler_overlay = None
+        self.adaptive_resolution = None
+        self.transition = None
+        self.transition_uniforms = None
+        self.transition_mode = None
+        self.hot_reloader = None
+        # Job held back while frames are over budget, see _next_reload_job
+        self._deferred_reload_job: ReloadJob | None = None
+        self._reload_deferred_frames = 0
+        # Disabled by the benchmark, so that only the measured scene is rendered
+        self.is_prewarm_enabled = True
+        self.audio_input = None
+        self.audio_texture = None
+        # MidiTimelineRecorder or MidiTimeline being replayed
+        self.midi_timeline = None
+        self._audio_frame = None
+        self.transition_fbo = None
+        self.transition_duration = DEFAULT_TRANSITION_DURATION
+        self.transition_res_factor = DEFAULT_TRANSITION_RES_FACTOR
+        self.shader_disk_cache = ShaderDiskCache(screen_ctx)
+        self.program_cache = ProgramCache(
+            screen_ctx, disk_cache=self.shader_disk_cache
+        )
 
         self.init_general_funcs_bindings()
         self.init_post_processing()
+        self.quad = mglw.geometry.quad_fs()
+        self.prewarmer = ScenePrewarmer(
+            screen_ctx,
+            self.program_cache,
+            self.fbo_pool,
+            self.texture_registry,
+            self.quad,
+            frame_uniforms=FRAME_UNIFORMS,
+        )
         self.current_scene_index = (
             0
             if starting_scene_name is None
-            else self.scenes.index(
-                next(
-                    scene for scene in self.scenes if scene.name == starting_scene_name
-                )
-            )
+            else self.scenes.index_of(starting_scene_name)
         )
-        pprint(self.scenes)
+        pprint(self.scenes.names)
+
+        # Only the first scene is needed to show a frame, the others are loaded
+        # in the background and compiled on later frames
+        self.program_cache.prewarm([self.current_scene])
+        self.scenes.start_prefetch(self.current_scene_index)
+        self.prewarmer.compile_later(
+            self.scenes[(self.current_scene_index + offset) % len(self.scenes)]
+            for offset in range(1, len(self.scenes))
+        )
+
         self._new_scene_index = self.current_scene_index  # triggers self.load_new_scene()
+        # Chosen ahead so the random scene can be prewarmed
+        self._next_random_index = None
+        self._prewarm_resolution = None
         self.start_time = None
 
     def init_general_funcs_bindings(self):
@@ -75,107 +171,219 @@ class ScenesManager:
         for control_selector, afunc in binds:
             self.input_manager.bind_general_funcs(control_selector, afunc)
 
-    def _load_textures(self):
-        """Load all images from resources/textures directory as textures"""
-        if not PIL_AVAILABLE:
-            print("Warning: PIL/Pillow not available. Textures will not be loaded.")
-            print("Install Pillow with: pip install Pillow")
-            return
-
-        if not TEXTURES_DIR.exists():
-            print(f"Warning: Textures directory {TEXTURES_DIR} does not exist.")
-            return
-
-        # Supported image formats
-        image_extensions = {".jpg", ".jpeg", ".png", ".bmp", ".tga", ".gif"}
-
-        for texture_file in TEXTURES_DIR.iterdir():
-            if texture_file.suffix.lower() in image_extensions:
-                try:
-                    # Load image with PIL
-                    if not PIL_AVAILABLE:
-                        continue
-                    # Type checker: Image and np are available when PIL_AVAILABLE is True
-                    assert Image is not None and np is not None, "PIL modules should be available"  # type: ignore
-                    img = Image.open(texture_file).convert("RGB")  # type: ignore
-                    img_data = np.array(img)  # type: ignore
-
-                    # Create texture from image data
-                    texture = self.screen_ctx.texture(img.size, 3, img_data.tobytes())
-                    texture.filter = (self.screen_ctx.LINEAR, self.screen_ctx.LINEAR)
-                    texture.build_mipmaps()
-
-                    # Store texture with filename (without extension) as key
-                    texture_name = texture_file.stem
-                    self.textures[texture_name] = texture
-                    print(f"Loaded texture: {texture_name} from {texture_file.name}")
-
-                except Exception as e:
-                    print(f"Error loading texture {texture_file.name}: {e}")
-
     def init_post_processing(self):
         """Initialize post-processing shader and FBO"""
-        # Load textures first
-        self._load_textures()
+        # Register the textures first, they are decoded and uploaded over the next frames
+        self.texture_loader.start()
 
         # Load post-processing shader
-        vertex_path = SHADERS_DIR / "vertex.glsl"
-        fragment_path = SHADERS_DIR / "post_processing.glsl"
+        vertex_path = SHADERS_DIR / VERTEX_SHADER_FILE
+        fragment_path = SHADERS_DIR / POST_PROCESSING_SHADER_FILE
 
         with open(vertex_path, "r") as vf, open(fragment_path, "r") as ff:
             vertex_source = vf.read()
             fragment_source = ff.read()
 
-        # Create post-processing shader program
-        self.post_prog = self.screen_ctx.program(
-            vertex_shader=vertex_source, fragment_shader=fragment_source
-        )
-
-        # Bind textures to shader uniforms (uniforms must be declared in shader)
-        self._bind_textures_to_shader()
-
         # Load post-processing parameters from dedicated file
         self.post_params = self._load_post_processing_params()
+        self.post_prog, self.post_uniforms, self.post_params_block = (
+            self._build_post_processing(vertex_source, fragment_source, self.post_params)
+        )
 
         # Bind post-processing parameters to secondary bindings
         for param in self.post_params:
             self.input_manager.bind_secondary_param(param)
 
-    def _bind_textures_to_shader(self):
-        """Bind loaded textures to post-processing shader uniforms.
-        
-        Textures are bound to uniforms that are manually declared in the shader.
-        The method tries to match texture names to uniform names using common conventions:
-        - uTexture_<texture_name>
-        - <texture_name>
+    def _build_post_processing(self, vertex_source: str, fragment_source: str, post_params):
         """
-        if not self.textures or not self.post_prog:
+        Compile the post-processing program and resolve its uniforms
+
+        Returns:
+            Tuple of (program, uniform table, params uniform block or None)
+        """
+        if self.global_ctx.is_post_params_ubo:
+            fragment_source = define_in_source(fragment_source, POST_PARAMS_UBO_DEFINE)
+
+        # Create post-processing shader program
+        post_prog = self.program_cache.compile(
+            vertex_source, fragment_source, POST_PROCESSING_PROGRAM
+        )
+
+        try:
+            # Bind textures to shader uniforms (uniforms must be declared in shader)
+            self.texture_registry.add_program(post_prog, warn_unmatched=True)
+
+            post_uniforms = UniformTable(post_prog, post_params)
+            post_params_block = None
+            if self.global_ctx.is_post_params_ubo:
+                # Pack the params into one std140 buffer instead of a uniform each
+                post_params_block = Std140UniformBlock(
+                    self.screen_ctx,
+                    post_prog,
+                    fragment_source,
+                    POST_PARAMS_BLOCK_NAME,
+                    post_params,
+                )
+        except Exception:
+            self.texture_registry.remove_program(post_prog)
+            post_prog.release()
+            raise
+
+        return post_prog, post_uniforms, post_params_block
+
+    def enable_profiling(self, output_path: str | None = None, is_overlay: bool = False):
+        """
+        Time the render spans of every frame
+
+        Args:
+            output_path: CSV (.csv) or JSON lines file the frame times are
+                periodically written to
+            is_overlay: Draw the frame times graph over the output
+        """
+        self.profiler = FrameProfiler(
+            self.screen_ctx,
+            gpu_span_names=GPU_SPANS,
+            gpu_latency=PROFILER_GPU_LATENCY,
+            output_path=output_path,
+        )
+        if is_overlay:
+            self.profiler_overlay = ProfilerOverlay(self.screen_ctx, self.profiler)
+            self.texture_registry.register(
+                ProfilerOverlay.TEXTURE_NAME, self.profiler_overlay.texture
+            )
+            self._configure_post_uniforms()
+
+    def enable_adaptive_resolution(self, target_fps: float):
+        """
+        Adapt the first pass resolution of the scenes to hold a target frame rate,
+        from the GPU frame times of the profiler (profiling is enabled if needed)
+        """
+        if self.profiler is NULL_PROFILER:
+            self.enable_profiling()
+        self.adaptive_resolution = AdaptiveResolution(target_fps)
+        self.adaptive_resolution.reset(self.current_scene)
+        self._configure_post_uniforms()
+
+    def _configure_post_uniforms(self):
+        """Set the post-processing uniforms of the enabled features"""
+        post_uniforms = self.post_uniforms
+        if self.profiler_overlay is None or post_uniforms is None:
             return
 
-        # Bind textures to texture units starting from 1 (0 is reserved for uTexture)
-        texture_unit = 1
-        for texture_name, texture in self.textures.items():
-            # Clean the texture name for uniform matching
-            clean_name = texture_name.replace("-", "_").replace(" ", "_")
-            
-            # Try different uniform name conventions
-            uniform_candidates = [
-                f"uTexture_{clean_name}",  # uTexture_tv_error
-                clean_name,  # tv_error
-            ]
-            
-            bound = False
-            for uniform_name in uniform_candidates:
-                if uniform_name in self.post_prog:
-                    texture.use(texture_unit)
-                    self.post_prog[uniform_name].value = texture_unit
-                    texture_unit += 1
-                    bound = True
-                    break
-            
-            if not bound:
-                print(f"Warning: Texture '{texture_name}' loaded but no matching uniform found in shader. "
-                      f"Declare a uniform like 'uniform sampler2D uTexture_{clean_name};' in the shader.")
+        post_uniforms.set_uniform("uShowProfilerOverlay", True)
+        post_uniforms.set_uniform("uProfilerOverlayBudget", self._frame_budget_ms())
+
+    def _frame_budget_ms(self) -> float:
+        if self.adaptive_resolution is not None:
+            return self.adaptive_resolution.budget_ms
+        return DEFAULT_FRAME_BUDGET_MS
+
+    def enable_midi_recording(self, output_path: str):
+        """
+        Record the MIDI events applied on every frame, to replay the show offline
+        (see render_offline.py)
+        """
+        self.midi_timeline = MidiTimelineRecorder(
+            Path(output_path),
+            header={
+                "seed": self.global_ctx.random_seed,
+                "start_scene": self.current_scene.name,
+                "transition": {
+                    "mode": self.transition_mode,
+                    "duration": self.transition_duration,
+                    "res_factor": self.transition_res_factor,
+                }
+                if self.transition_mode
+                else None,
+            },
+        )
+        self.input_manager.event_listener = self.midi_timeline.record
+
+    def enable_midi_playback(self, timeline: MidiTimeline):
+        """Replay a recorded timeline instead of the events of a MIDI input"""
+        self.midi_timeline = timeline
+        timeline.play(self.input_manager.event_queue)
+
+    def close(self):
+        if isinstance(self.midi_timeline, MidiTimelineRecorder):
+            self.input_manager.event_listener = None
+            self.midi_timeline.close()
+
+        # Written at shutdown, a frame never waits for the disk
+        self.shader_disk_cache.flush()
+        get_logger().info(self.shader_disk_cache.summary())
+
+    def enable_transitions(
+        self,
+        mode: str = "crossfade",
+        duration: float = DEFAULT_TRANSITION_DURATION,
+        res_factor: float = DEFAULT_TRANSITION_RES_FACTOR,
+    ):
+        """
+        Blend scene changes instead of cutting from one scene to the next
+
+        Args:
+            mode: Blend of the two scenes, one of TRANSITION_MODES
+            duration: Transition duration in seconds
+            res_factor: Scale of the first pass resolution of both scenes
+                while a transition runs
+        """
+        if mode not in TRANSITION_MODES:
+            raise ValueError(
+                f"Unknown transition '{mode}', expected one of {', '.join(TRANSITION_MODES)}."
+            )
+
+        with open(SHADERS_DIR / VERTEX_SHADER_FILE, "r") as vf, open(
+            SHADERS_DIR / TRANSITION_SHADER_FILE, "r"
+        ) as ff:
+            program = self.program_cache.compile(vf.read(), ff.read(), TRANSITION_PROGRAM)
+
+        self.transition_mode = mode
+        self.transition_uniforms = self._build_transition(program)
+        self.transition_duration = duration
+        self.transition_res_factor = res_factor
+
+    def _build_transition(self, program) -> UniformTable:
+        # Set first by enable_transitions
+        assert self.transition_mode is not None
+        self.texture_registry.add_program(program)
+        transition_uniforms = UniformTable(program, ())
+        transition_uniforms.set_uniform(
+            "uTransitionMode", TRANSITION_MODES[self.transition_mode]
+        )
+        return transition_uniforms
+
+    def enable_audio(self, audio_input: AudioInput):
+        """
+        Feed the analysis of an audio input to the shaders: the band levels as
+        the iAudioBands texture, and the iBeat and iAudioLevel uniforms
+
+        Args:
+            audio_input: A started AudioInput
+        """
+        self.audio_input = audio_input
+        self.audio_texture = AudioTexture(
+            self.screen_ctx, self.texture_registry, audio_input.band_count
+        )
+
+    def enable_hot_reload(self):
+        """
+        Watch the scene and shader files, and swap in the programs and params of
+        the edited ones between frames
+        """
+        self.hot_reloader = HotReloader(
+            self.scenes,
+            self._load_scene_file,
+            self._load_post_processing_params,
+            SCENES_DIR,
+            SHADERS_DIR,
+            POST_PROCESSING_PARAMS_FILE,
+            program_files={
+                RELOAD_POST: (VERTEX_SHADER_FILE, POST_PROCESSING_SHADER_FILE),
+                RELOAD_TRANSITION: (VERTEX_SHADER_FILE, TRANSITION_SHADER_FILE),
+            },
+        )
+        self.hot_reloader.start()
 
     @property
     def current_scene(self):
@@ -204,25 +412,33 @@ class ScenesManager:
         acontroller = controller_cls(**data["controller"].get("args", {}))
         return Param(name=data["name"], button=abuttom, controller=acontroller)
 
-    def _load_scens_from_toml_files(self):
-        for scene_file in SCENES_DIR.iterdir():
-            if scene_file.name == POST_PROCESSING_PARAMS_FILE.name:
-                continue
-            if scene_file.suffix == ".toml":
-                print(f"Loading scene from file: {scene_file.name}")
-                with open(scene_file, "rb") as f:
-                    data = tomllib.load(f)
-
-                data["params"] = [
-                    self._generate_param_from_file_data(p)
-                    for p in data.get("params", [])
-                ]
-                ascene = Scene(**data)
-                self.scenes.append(ascene)
-                print(f"Scene {ascene.name} loaded")
-
+    def _index_scene_files(self) -> SceneLibrary:
+        """Index the scenes by name, they are loaded from their files on first use"""
+        scene_files = [
+            scene_file
+            for scene_file in SCENES_DIR.iterdir()
+            if scene_file.suffix == ".toml"
+            and scene_file.name != POST_PROCESSING_PARAMS_FILE.name
+        ]
         # Reorder scenes according to scenes_order.json
-        self._reorder_scenes()
+        scenes = SceneLibrary(scene_files, self._load_scene_file, order_file=SCENES_ORDER_FILE)
+        print(f"Indexed {len(scenes)} scenes")
+        return scenes
+
+    @classmethod
+    def _load_scene_file(cls, scene_file: Path) -> Scene:
+        # Also called from the prefetch thread, log instead of printing
+        logger = get_logger()
+        logger.info("Loading scene from file: %s", scene_file.name)
+        with open(scene_file, "rb") as f:
+            data = tomllib.load(f)
+
+        data["params"] = [
+            cls._generate_param_from_file_data(p) for p in data.get("params", [])
+        ]
+        ascene = Scene(**data)
+        logger.info("Scene %s loaded", ascene.name)
+        return ascene
 
     def _load_post_processing_params(self):
         with open(POST_PROCESSING_PARAMS_FILE, "rb") as f:
@@ -231,41 +447,7 @@ class ScenesManager:
         params_data = data.get("params", [])
         return [self._generate_param_from_file_data(p) for p in params_data]
 
-    def _reorder_scenes(self):
-        """Reorder scenes according to the order specified in scenes_order.json"""
-        try:
-            with open(SCENES_ORDER_FILE, "r") as f:
-                config = json.load(f)
-
-            scene_order = config.get("scene_order", [])
-            if not scene_order:
-                return
-
-            # Create a mapping of current scene names to Scene objects
-            scenes_by_name = {scene.name: scene for scene in self.scenes}
-
-            # Find scenes that are in the order list and sort them by order
-            ordered_scenes = []
-            for name in scene_order:
-                if name in scenes_by_name:
-                    ordered_scenes.append(scenes_by_name[name])
-
-            # Add any scenes that weren't in the order list at the end
-            for scene in self.scenes:
-                if scene not in ordered_scenes:
-                    ordered_scenes.append(scene)
-
-            self.scenes = ordered_scenes
-            print(f"Scenes reordered according to scenes_order.json")
-
-        except FileNotFoundError:
-            print(f"Warning: {SCENES_ORDER_FILE} not found. Using default order.")
-        except (json.JSONDecodeError, KeyError) as e:
-            print(
-                f"Warning: Error parsing {SCENES_ORDER_FILE}: {e}. Using default order."
-            )
-
-    def render(self, time, frame_time, resolution):
+    def render(self, time, frame_time, resolution, target=None):
         """
         Render the current scene with 2-pass rendering
 
@@ -273,62 +455,403 @@ class ScenesManager:
             time: Current time for animations
             frame_time: Time since last frame
             resolution: Screen resolution as (width, height, aspect_ratio)
+            target: Framebuffer to render to, defaults to the screen
         """
-        if self._new_scene_index is not None:
-            self.load_new_scene()
+        profiler = self.profiler
+        frame_start = perf_counter()
+
+        # One timestamp for the whole frame, and the timed resets that came due
+        self.global_ctx.scheduler.tick()
+
+        # Apply the MIDI events received since the last frame
+        with profiler.span("midi"):
+            if self.midi_timeline is not None:
+                self.midi_timeline.begin_frame(time)
+            self.input_manager.process_events()
+
+        is_scene_loaded = self._new_scene_index is not None
+        if is_scene_loaded:
+            with profiler.span("scene_load"):
+                self.load_new_scene()
+                # A replay must render the same frames whatever the load takes,
+                # so a scene starts with every texture in place
+                if isinstance(self.midi_timeline, MidiTimeline) and self.texture_loader:
+                    self.texture_loader.finish()
             self._new_scene_index = None
 
         self.global_ctx.update_last_time(time)
 
+        # Write a slice of the textures still loading
+        if self.texture_loader:
+            with profiler.span("texture_upload"):
+                self.texture_loader.upload()
+
         width, height = int(resolution[0]), int(resolution[1])
 
-        # Apply resolution factor if specified
-        if self.current_scene.res_factor is not None:
-            fbo_width = int(width * self.current_scene.res_factor)
-            fbo_height = int(height * self.current_scene.res_factor)
-        else:
-            fbo_width = width
-            fbo_height = height
+        transition = self.transition
+
+        res_factor = self.current_scene.res_factor
+        if self.adaptive_resolution is not None:
+            # Two scenes rendered at once say nothing about the scene's own load.
+            # Only the first pass is scaled, so only its time is measured.
+            if transition is None:
+                self.adaptive_resolution.update(
+                    self.profiler.last_gpu_frame, self.profiler.last_gpu_ms("pass1")
+                )
+            res_factor = self.adaptive_resolution.res_factor
+
+        if transition is not None:
+            res_factor = (res_factor or 1.0) * self.transition_res_factor
+            transition.fbo = self._sized_fbo(
+                transition.fbo,
+                self._transition_fbo_size(transition.scene, width, height),
+            )
 
         # Resize FBO if needed
-        if (
-            self.fbo is None
-            or self.fbo_texture.width != fbo_width
-            or self.fbo_texture.height != fbo_height
-        ):
-            if self.fbo is not None:
-                self.fbo.release()
-            self.fbo_texture = self.screen_ctx.texture((fbo_width, fbo_height), 4)
-            self.fbo_texture.filter = (self.screen_ctx.LINEAR, self.screen_ctx.LINEAR)
-            self.fbo = self.screen_ctx.framebuffer([self.fbo_texture])
-
-        # Create FBO resolution tuple for shader (aspect ratio based on FBO dimensions)
-        fbo_resolution = (
-            fbo_width,
-            fbo_height,
-            fbo_width / fbo_height if fbo_height > 0 else 1.0,
-        )
+        self.fbo = self._sized_fbo(self.fbo, self._fbo_size(res_factor, width, height))
+        self.fbo_texture = self.fbo.color_attachments[0]
 
         # Update parameters for both passes
-        self._update_params(time, frame_time, fbo_resolution)
-        self._update_post_params(time, frame_time, resolution)
-        self.global_ctx.apply_speed_hold(frame_time)
+        with profiler.span("params"):
+            if self.audio_input is not None:
+                self._update_audio(self.audio_input)
+            self._update_params(time, frame_time, self._fbo_resolution(self.fbo))
+            if transition is not None:
+                self._update_params(
+                    time,
+                    frame_time,
+                    self._fbo_resolution(transition.fbo),
+                    uniforms=transition.uniforms,
+                )
+            self._update_post_params(time, frame_time, resolution)
+            self.global_ctx.apply_speed_hold(frame_time)
 
         # FIRST PASS: Render scene to FBO
-        self.fbo.use()
-        self.fbo.clear()
-        self.quad.render(self.current_prog)
+        with profiler.span("pass1"):
+            self.fbo.use()
+            self.fbo.clear()
+            self.quad.render(self.current_prog)
+            if transition is not None:
+                # Sized with the scene FBO above
+                assert transition.fbo is not None
+                transition.fbo.use()
+                transition.fbo.clear()
+                self.quad.render(transition.uniforms.program)
+
+        post_input = self.fbo_texture
+        if transition is not None:
+            with profiler.span("transition"):
+                post_input = self._composite_transition(transition, post_input, time)
+
+        with profiler.span("texture_bind"):
+            post_input.use(0)
+            if self.profiler_overlay is not None:
+                self.profiler_overlay.update()
 
         # SECOND PASS: Render FBO texture to screen with post-processing
-        self.screen_ctx.screen.use()
-        self.screen_ctx.clear()
-        self.fbo_texture.use(0)
-        # Re-bind textures in case they need to be refreshed
-        self._bind_textures_to_shader()
-        self.quad.render(self.post_prog)
+        with profiler.span("pass2"):
+            (target or self.screen_ctx.screen).use()
+            self.screen_ctx.clear()
+            self.quad.render(self.post_prog)
+
+        if transition is not None and transition.progress(time) >= 1.0:
+            self._end_transition()
+
+        # Prepare the scenes that may come next, on frames without a switch
+        if self.is_prewarm_enabled and (
+            is_scene_loaded or self._prewarm_resolution != (width, height)
+        ):
+            self._schedule_prewarm(width, height)
+        else:
+            reload_job = self._next_reload_job(frame_start)
+            if reload_job is not None:
+                with profiler.span("reload"):
+                    self._apply_reload(reload_job)
+            elif self.is_prewarm_enabled and self._deferred_reload_job is None:
+                with profiler.span("prewarm"):
+                    self.prewarmer.run_one()
+
+        change_log.flush()
+
+    def _next_reload_job(self, frame_start: float) -> ReloadJob | None:
+        """
+        The reload job to apply on this frame, if any
+
+        Args:
+            frame_start: perf_counter() at the start of the frame
+        """
+        # Programs are swapped once the outgoing scene of a transition is released
+        if self.hot_reloader is None or self.transition is not None:
+            return None
+        job = self._deferred_reload_job or self.hot_reloader.next_job()
+        self._deferred_reload_job = None
+        if job is None:
+            return None
+
+        # Jobs are already one program per frame. A compile can still take
+        # longer than a frame, so it waits for a frame with time left.
+        elapsed_ms = (perf_counter() - frame_start) * 1000.0
+        if (
+            elapsed_ms > self._frame_budget_ms()
+            and self._reload_deferred_frames < RELOAD_MAX_DEFERRED_FRAMES
+        ):
+            self._deferred_reload_job = job
+            self._reload_deferred_frames += 1
+            return None
+
+        self._reload_deferred_frames = 0
+        return job
+
+    def _apply_reload(self, job: ReloadJob):
+        """
+        Compile the program of a reload job and swap it in. On failure the
+        previous program stays live.
+        """
+        if job.kind == RELOAD_SCENE:
+            # Scene jobs always carry their scene
+            assert job.scene_index is not None and job.scene is not None
+            if not self._is_scene_resident(job.scene_index):
+                # Compiled from its files when it is used
+                self._replace_scene(job.scene_index, job.scene)
+                return
+            try:
+                program = self.program_cache.compile(
+                    job.vertex_source, job.fragment_source, job.scene.name
+                )
+            except Exception as e:
+                self._log_reload_failure(job, e)
+                return
+            self._swap_scene_program(job.scene_index, job.scene, program)
+
+        elif job.kind == RELOAD_POST:
+            post_params = job.post_params or self.post_params
+            try:
+                built = self._build_post_processing(
+                    job.vertex_source, job.fragment_source, post_params
+                )
+            except Exception as e:
+                self._log_reload_failure(job, e)
+                return
+            self._swap_post_processing(built, post_params)
+
+        else:
+            if self.transition_uniforms is None:
+                return
+            try:
+                program = self.program_cache.compile(
+                    job.vertex_source, job.fragment_source, TRANSITION_PROGRAM
+                )
+            except Exception as e:
+                self._log_reload_failure(job, e)
+                return
+            previous_program = self.transition_uniforms.program
+            self.transition_uniforms = self._build_transition(program)
+            self.texture_registry.remove_program(previous_program)
+            previous_program.release()
+
+        get_logger().info("Reloaded the %s", job.description)
+
+    @staticmethod
+    def _log_reload_failure(job: ReloadJob, error: Exception):
+        get_logger().error(
+            "Reloading the %s failed, keeping the previous program:\n%s",
+            job.description,
+            error,
+        )
+
+    def _is_scene_resident(self, scene_index: int) -> bool:
+        if scene_index == self.current_scene_index:
+            return True
+        if not self.scenes.is_loaded(scene_index):
+            return False
+        return self.scenes[scene_index].name in self.program_cache
+
+    def _replace_scene(self, scene_index: int, new_scene: Scene):
+        """Put a reloaded scene in the library, keeping the values of its params"""
+        if self.scenes.is_loaded(scene_index):
+            previous_scene = self.scenes[scene_index]
+            if new_scene is not previous_scene:
+                self._adopt_param_values(new_scene.params, previous_scene.params)
+        self.scenes.replace(scene_index, new_scene)
+
+    def _swap_scene_program(self, scene_index: int, new_scene: Scene, program):
+        previous_scene = self.scenes[scene_index]
+        if new_scene is not previous_scene:
+            self._adopt_param_values(new_scene.params, previous_scene.params)
+            self.scenes.replace(scene_index, new_scene)
+
+        table = UniformTable(program, new_scene.params)
+        table.resolve(FRAME_UNIFORMS)
+        self.texture_registry.add_program(program)
+        if previous_scene.name in self.program_cache:
+            previous_program = self.program_cache.get(previous_scene).program
+            self.texture_registry.remove_program(previous_program)
+        self.program_cache.replace(previous_scene.name, new_scene, table)
+
+        if scene_index == self.current_scene_index:
+            self.current_uniforms = table
+            self.current_prog = program
+            if new_scene is not previous_scene:
+                self._bind_scene_params(new_scene)
+
+    def _swap_post_processing(self, built: tuple, post_params):
+        previous_prog, previous_block = self.post_prog, self.post_params_block
+        if post_params is not self.post_params:
+            self._adopt_param_values(post_params, self.post_params)
+            self.post_params = post_params
+            self.input_manager.unbind_secondary_params()
+            for param in self.post_params:
+                self.input_manager.bind_secondary_param(param)
+
+        self.post_prog, self.post_uniforms, self.post_params_block = built
+        self._configure_post_uniforms()
+
+        if previous_prog is not None:
+            self.texture_registry.remove_program(previous_prog)
+            previous_prog.release()
+        if previous_block is not None:
+            previous_block.release()
+
+    @staticmethod
+    def _adopt_param_values(params, previous_params):
+        """Carry the controller values of the previous params over, by param name"""
+        previous_by_name = {param.name: param for param in previous_params}
+        for param in params:
+            previous = previous_by_name.get(param.name)
+            if previous is not None:
+                param.controller.adopt_value(previous.controller)
+
+    def _composite_transition(self, transition: Transition, to_texture, time: float):
+        """
+        Blend the first pass outputs of the outgoing and incoming scenes
+
+        Args:
+            transition: The running transition, its FBO holds the outgoing scene
+            to_texture: First pass output of the incoming scene
+            time: Current time
+
+        Returns:
+            The texture holding the blend
+        """
+        transition_uniforms = self.transition_uniforms
+        # A transition only runs when enabled, after its outgoing scene was rendered
+        assert transition_uniforms is not None and transition.fbo is not None
+        from_texture = transition.fbo.color_attachments[0]
+        size = (
+            max(from_texture.width, to_texture.width),
+            max(from_texture.height, to_texture.height),
+        )
+        self.transition_fbo = self._sized_fbo(self.transition_fbo, size)
+
+        # Units are only rebound when a pooled FBO changed
+        for name, texture in (
+            (TRANSITION_FROM_TEXTURE, from_texture),
+            (TRANSITION_TO_TEXTURE, to_texture),
+        ):
+            if self.texture_registry.get(name) is not texture:
+                self.texture_registry.register(name, texture)
+
+        transition_uniforms.set_uniform("uProgress", transition.progress(time))
+        transition_uniforms.set_uniform(
+            "iResolution", self._fbo_resolution(self.transition_fbo)
+        )
+        self.transition_fbo.use()
+        self.quad.render(transition_uniforms.program)
+        return self.transition_fbo.color_attachments[0]
+
+    def _end_transition(self):
+        """Stop rendering the outgoing scene"""
+        transition = self.transition
+        if transition is None:
+            return
+        if transition.fbo is not None:
+            self.fbo_pool.release(transition.fbo)
+        self.transition = None
+        if self.transition_fbo is not None:
+            self.fbo_pool.release(self.transition_fbo)
+            self.transition_fbo = None
+        self.program_cache.pin(self.current_scene)
+        if self.adaptive_resolution is not None:
+            self.adaptive_resolution.reset(self.current_scene)
+
+    def _sized_fbo(self, fbo, size: Tuple[int, int]):
+        """
+        Return the FBO if it has the given size, otherwise swap it for a pooled one
+        """
+        if fbo is not None and fbo.size == size:
+            return fbo
+
+        with self.profiler.span("fbo_resize"):
+            # Reuse a pooled FBO, switching back to a size doesn't reallocate
+            if fbo is not None:
+                self.fbo_pool.release(fbo)
+            return self.fbo_pool.acquire(size)
+
+    @staticmethod
+    def _fbo_resolution(fbo) -> Tuple[int, int, float]:
+        """FBO resolution tuple for shader (aspect ratio based on FBO dimensions)"""
+        width, height = fbo.size
+        return width, height, width / height if height > 0 else 1.0
+
+    def _start_res_factor(self, scene: Scene) -> float | None:
+        """Resolution factor a scene is rendered at when switched to"""
+        if self.adaptive_resolution is not None:
+            return self.adaptive_resolution.start_res_factor(scene)
+        return scene.res_factor
+
+    @staticmethod
+    def _fbo_size(res_factor: float | None, width: int, height: int) -> Tuple[int, int]:
+        """First pass FBO size, scaled by the resolution factor if specified"""
+        if res_factor is None:
+            return width, height
+        return max(1, int(width * res_factor)), max(1, int(height * res_factor))
+
+    def _schedule_prewarm(self, width: int, height: int):
+        """Queue the neighbors of the current scene and the next random one"""
+        self._prewarm_resolution = (width, height)
+        candidates = [
+            self.scenes[(self.current_scene_index + 1) % len(self.scenes)],
+            self.scenes[(self.current_scene_index - 1) % len(self.scenes)],
+        ]
+        if self._next_random_index is not None:
+            candidates.append(self.scenes[self._next_random_index])
+
+        transition_from_size = None
+        if self.transition_uniforms is not None:
+            # The outgoing scene is blended out at the transition resolution
+            transition_from_size = self._transition_fbo_size(
+                self.current_scene, width, height
+            )
+
+        targets = []
+        for scene in candidates:
+            if scene is self.current_scene:
+                continue
+            fbo_size = self._fbo_size(self._start_res_factor(scene), width, height)
+            if transition_from_size is None:
+                targets.append((scene, [fbo_size]))
+                continue
+
+            # Both scenes, their blend, then the scene alone once the transition ends
+            to_size = self._transition_fbo_size(scene, width, height)
+            blend_size = (
+                max(to_size[0], transition_from_size[0]),
+                max(to_size[1], transition_from_size[1]),
+            )
+            targets.append((scene, [to_size, transition_from_size, blend_size, fbo_size]))
+        self.prewarmer.schedule(targets)
+
+    def _transition_fbo_size(self, scene: Scene, width: int, height: int) -> Tuple[int, int]:
+        """First pass FBO size of a scene while a transition runs"""
+        res_factor = (self._start_res_factor(scene) or 1.0) * self.transition_res_factor
+        return self._fbo_size(res_factor, width, height)
 
     def _update_params(
-        self, time: float, frame_time: float, resolution: Tuple[float, float, float]
+        self,
+        time: float,
+        frame_time: float,
+        resolution: Tuple[float, float, float],
+        uniforms: UniformTable | None = None,
     ):
         """
         Update shader uniforms with current parameter values for first pass
@@ -337,21 +860,34 @@ class ScenesManager:
             time: Current time for animations
             frame_time: Time since last frame
             resolution: Screen resolution as (width, height, aspect_ratio)
+            uniforms: Uniforms of the scene program, defaults to the current scene's
         """
-        if self.current_prog is None:
+        uniforms = uniforms or self.current_uniforms
+        if uniforms is None:
             return
 
-        if "iTime" in self.current_prog:
-            adjusted_time = self.global_ctx.get_adjusted_time(time)
-            self.current_prog["iTime"].value = adjusted_time
-
-        if "iResolution" in self.current_prog:
-            self.current_prog["iResolution"].value = resolution
+        adjusted_time = self.global_ctx.get_adjusted_time(time)
+        uniforms.set_uniform("iTime", adjusted_time)
+        uniforms.set_uniform("iResolution", resolution)
+        self._set_audio_uniforms(uniforms)
 
         _ = frame_time  # for future use
 
-        # Update shader parameters using the scene's method
-        self.current_scene.update_shader_params(self.current_prog)
+        # Update shader parameters from the scene's params
+        uniforms.upload_params()
+
+    def _update_audio(self, audio_input: AudioInput):
+        """Take the latest audio frame and upload its bands"""
+        self._audio_frame = audio_input.latest
+        if self._audio_frame is not None and self.audio_texture is not None:
+            self.audio_texture.update(self._audio_frame)
+
+    def _set_audio_uniforms(self, uniforms: UniformTable):
+        frame = self._audio_frame
+        if frame is None:
+            return
+        uniforms.set_uniform(AUDIO_BEAT_UNIFORM, frame.beat)
+        uniforms.set_uniform(AUDIO_LEVEL_UNIFORM, frame.rms)
 
     def _update_post_params(
         self, time: float, frame_time: float, resolution: Tuple[float, float, float]
@@ -364,17 +900,24 @@ class ScenesManager:
             frame_time: Time since last frame
             resolution: Screen resolution as (width, height, aspect_ratio)
         """
-        if self.post_prog is None:
+        if self.post_uniforms is None:
             return
 
-        if "iResolution" in self.post_prog:
-            self.post_prog["iResolution"].value = resolution
-
-        if "iTime" in self.post_prog:
-            self.post_prog["iTime"].value = time
+        self.post_uniforms.set_uniform("iResolution", resolution)
+        self.post_uniforms.set_uniform("iTime", time)
+        self._set_audio_uniforms(self.post_uniforms)
+        if self.profiler_overlay is not None:
+            self.post_uniforms.set_uniform(
+                "uProfilerOverlayHead", self.profiler_overlay.head
+            )
 
         # Update post-processing shader parameters
-        update_shader_params_from_list(self.post_prog, self.post_params)
+        self.post_uniforms.upload_params()
+        if self.post_params_block is not None:
+            self.post_params_block.upload()
+
+    def change_to_scene(self, index: int):
+        self._new_scene_index = index % len(self.scenes)
 
     def change_to_next_scene(self, value: int | None = None):
         if value is not None and value != MIDI_BUTTEN_CLICK:
@@ -389,42 +932,65 @@ class ScenesManager:
     def change_to_random_scene(self, value: int | None = None):
         if value is not None and value != MIDI_BUTTEN_CLICK:
             return
+        if self._next_random_index is None:
+            self._next_random_index = self._choose_random_scene_index()
+        if self._next_random_index is not None:
+            self._new_scene_index = self._next_random_index
+
+    def _choose_random_scene_index(self) -> int | None:
         available_scenes = [
-            idx for idx, scene in enumerate(self.scenes) if scene != self.current_scene
+            idx for idx in range(len(self.scenes)) if idx != self.current_scene_index
         ]
-        if available_scenes:
-            self._new_scene_index = random.choice(available_scenes)
+        return random.choice(available_scenes) if available_scenes else None
 
     def load_new_scene(self):
+        previous_scene, previous_uniforms = self.current_scene, self.current_uniforms
+        if self.transition is not None:
+            # A new change cuts the running transition short
+            self._end_transition()
+
+        # Only called on a pending change
+        assert self._new_scene_index is not None
         self.current_scene_index = self._new_scene_index
         new_scene = self.current_scene
         print("=" * 80)
         print(f"Change to scene {new_scene.name}")
         self.global_ctx.reset_time_params()
+        if self.adaptive_resolution is not None:
+            self.adaptive_resolution.reset(new_scene)
 
         # Reset all post-processing parameters to initial values
         for param in self.post_params:
             if param.is_reset_on_scene_change:
                 param.controller.reset()
 
-        # Release old program if it exists
-        if self.current_prog is not None:
-            self.current_prog.release()
-
-        # Load shader source code from the scene
-        vertex_source, fragment_source = new_scene.get_shaders()
+        # Keep rendering the previous scene while blending it out
+        if (
+            self.transition_uniforms is not None
+            and previous_uniforms is not None
+            and previous_scene is not new_scene
+        ):
+            self.transition = Transition(
+                previous_scene, previous_uniforms, self.transition_duration
+            )
 
-        # Create shader program
-        self.current_prog = self.screen_ctx.program(
-            vertex_shader=vertex_source, fragment_shader=fragment_source
+        # Swap to the cached program (compiled on a cache miss)
+        self.current_uniforms = self.program_cache.pin(
+            new_scene, keep=(previous_scene,) if self.transition is not None else ()
         )
-        self.quad = mglw.geometry.quad_fs()
+        self.current_prog = self.current_uniforms.program
+        self.texture_registry.add_program(self.current_prog)
+        self._next_random_index = self._choose_random_scene_index()
 
-        # Bind parameters and track them for future cleanup
-        self.input_manager.unbind_params()
         for param in new_scene.params:
             if param.is_reset_on_scene_change:
                 param.controller.reset()
+        self._bind_scene_params(new_scene)
+
+    def _bind_scene_params(self, scene: Scene):
+        # Bind parameters and track them for future cleanup
+        self.input_manager.unbind_params()
+        for param in scene.params:
             self.input_manager.bind_param(param)
             print(
                 f"{param.name:20} {param.button.name:16}",
@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from top_level.logger import get_logger
+
+
+SHADER_CACHE_DIR = Path(".cache") / "shaders"
+DRIVER_CACHE_DIR = SHADER_CACHE_DIR / "driver"
+MANIFEST_FILE = SHADER_CACHE_DIR / "manifest.json"
+
+# Driver shader cache switches. They are read when the GL context is created.
+DRIVER_CACHE_ENV = {
+    # Mesa (Intel / AMD / llvmpipe), enabled by default
+    "MESA_SHADER_CACHE_DIR": str(DRIVER_CACHE_DIR.resolve()),
+    # NVIDIA proprietary driver
+    "__GL_SHADER_DISK_CACHE": "1",
+    "__GL_SHADER_DISK_CACHE_PATH": str(DRIVER_CACHE_DIR.resolve()),
+    "__GL_SHADER_DISK_CACHE_SKIP_CLEANUP": "1",
+}
+
+
+def configure_driver_shader_cache():
+    """
+    Point the GL driver's persistent program binary cache at the project cache dir
+
+    Must be called before the GL context is created. Values already set in the
+    environment are left untouched.
+    """
+    DRIVER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for name, value in DRIVER_CACHE_ENV.items():
+        os.environ.setdefault(name, value)
+
+
+def driver_cache_size() -> Tuple[int, int]:
+    """
+    Returns:
+        Number of files and total bytes in the driver shader cache dir
+    """
+    file_count = 0
+    total_bytes = 0
+    for root, _, files in os.walk(DRIVER_CACHE_DIR):
+        for file_name in files:
+            try:
+                total_bytes += os.path.getsize(os.path.join(root, file_name))
+            except OSError:
+                continue
+            file_count += 1
+    return file_count, total_bytes
+
+
+class ShaderDiskCache:
+    """
+    Persistent shader cache keyed by shader sources and driver identity.
+
+    ModernGL can't hand out or adopt GL program binaries, so the linked binaries
+    themselves are stored by the driver (see configure_driver_shader_cache).
+    This class keeps the manifest of keys the driver has already linked, one
+    entry per named program, and times the compiles. Every program is still
+    compiled from source: whether the driver served a cached binary can't be
+    observed, so the summary only tells the programs already linked by an
+    earlier run (or earlier in this one) apart, next to what the driver
+    cache dir holds.
+
+    flush() and summary() touch the disk, they are meant for shutdown.
+    """
+
+    def __init__(self, screen_ctx):
+        self.screen_ctx = screen_ctx
+        info = screen_ctx.info
+        self.driver_identity = "|".join(
+            str(info.get(field, "")) for field in ("GL_VENDOR", "GL_RENDERER", "GL_VERSION")
+        )
+        self.manifest: Dict[str, dict] = self._load_manifest()
+        self._is_dirty = False
+
+        # Programs compiled this run, whose key was / wasn't in the manifest
+        self.known_count = 0
+        self.new_count = 0
+        self.known_compile_time = 0.0
+        self.new_compile_time = 0.0
+        self._driver_cache_start = driver_cache_size()
+
+    def key(self, vertex_source: str, fragment_source: str) -> str:
+        """
+        Build the cache key of a vertex/fragment shader pair
+
+        Returns:
+            Hex digest of the driver identity and both shader sources
+        """
+        digest = hashlib.sha256()
+        for part in (self.driver_identity, vertex_source, fragment_source):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def compile(self, vertex_source: str, fragment_source: str, name: Optional[str] = None):
+        """
+        Compile a program, recording whether its key was already in the manifest
+
+        Args:
+            vertex_source: Vertex shader source code
+            fragment_source: Fragment shader source code
+            name: Name of the program (e.g. its scene). The manifest entries of
+                its previous sources, on this driver, are dropped.
+
+        Returns:
+            The linked shader program
+        """
+        key = self.key(vertex_source, fragment_source)
+        start = time.perf_counter()
+        program = self.screen_ctx.program(
+            vertex_shader=vertex_source, fragment_shader=fragment_source
+        )
+        elapsed = time.perf_counter() - start
+
+        if key in self.manifest:
+            self.known_count += 1
+            self.known_compile_time += elapsed
+            return program
+
+        self.new_count += 1
+        self.new_compile_time += elapsed
+        if name is not None:
+            self._prune(name)
+        self.manifest[key] = {
+            "name": name,
+            "driver": self.driver_identity,
+            "compile_time": elapsed,
+        }
+        self._is_dirty = True
+        return program
+
+    def _prune(self, name: str):
+        """Drop the entries of the sources a program no longer uses"""
+        stale_keys = [
+            key
+            for key, entry in self.manifest.items()
+            if entry.get("name") == name and entry.get("driver") == self.driver_identity
+        ]
+        for key in stale_keys:
+            del self.manifest[key]
+
+    def flush(self):
+        """Write the manifest to disk if new keys were added"""
+        if not self._is_dirty:
+            return
+
+        try:
+            SHADER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(MANIFEST_FILE, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+            self._is_dirty = False
+        except OSError as e:
+            get_logger().warning("Failed to write shader cache manifest %s: %s", MANIFEST_FILE, e)
+
+    def summary(self) -> str:
+        file_count, total_bytes = driver_cache_size()
+        if file_count == 0:
+            driver_cache = "driver cache empty"
+        else:
+            start_count, _ = self._driver_cache_start
+            driver_cache = (
+                f"driver cache {file_count} files ({total_bytes / 1024:.0f} KB, "
+                f"{file_count - start_count:+d} files this run)"
+            )
+        return (
+            f"Shader programs: {self.known_count} already in the manifest "
+            f"({self.known_compile_time * 1000:.1f} ms), {self.new_count} new "
+            f"({self.new_compile_time * 1000:.1f} ms); {driver_cache}"
+        )
+
+    @staticmethod
+    def _load_manifest() -> Dict[str, dict]:
+        try:
+            with open(MANIFEST_FILE, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            get_logger().warning("Ignoring unreadable shader cache manifest %s: %s", MANIFEST_FILE, e)
+            return {}
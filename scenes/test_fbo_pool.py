@@ -0,0 +1,136 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from scenes, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+from scenes.fbo_pool import FramebufferPool
+
+
+class FakeTexture:
+    def __init__(self, size, components: int, dtype: str):
+        self.size = size
+        self.components = components
+        self.dtype = dtype
+        self.filter = None
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeFramebuffer:
+    def __init__(self, glo: int, texture: FakeTexture):
+        self.glo = glo
+        self.color_attachments = [texture]
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+class FakeContext:
+    LINEAR = 0x2601
+
+    def __init__(self):
+        self.framebuffers = 0
+
+    def texture(self, size, components: int, dtype: str = "f1") -> FakeTexture:
+        return FakeTexture(size, components, dtype)
+
+    def framebuffer(self, color_attachments) -> FakeFramebuffer:
+        self.framebuffers += 1
+        return FakeFramebuffer(self.framebuffers, color_attachments[0])
+
+
+# 10x10 RGBA8 framebuffers
+FBO_SIZE = (10, 10)
+FBO_BYTES = 10 * 10 * 4
+
+
+def test_released_framebuffer_is_reused():
+    ctx = FakeContext()
+    pool = FramebufferPool(ctx, max_bytes=10 * FBO_BYTES)
+    fbo = pool.acquire(FBO_SIZE)
+    pool.release(fbo)
+    assert pool.idle_bytes == FBO_BYTES
+
+    assert pool.acquire(FBO_SIZE) is fbo
+    assert (pool.hits, pool.misses) == (1, 1)
+    assert pool.idle_bytes == 0
+
+    # Another format is another framebuffer
+    other = pool.acquire(FBO_SIZE, dtype="f2")
+    assert other is not fbo
+    assert ctx.framebuffers == 2
+
+
+def test_least_recently_released_is_evicted_over_the_budget():
+    pool = FramebufferPool(FakeContext(), max_bytes=3 * FBO_BYTES)
+    small = pool.acquire(FBO_SIZE)
+    medium = pool.acquire((20, 10))
+    large = pool.acquire((30, 10))
+
+    pool.release(small)
+    pool.release(medium)
+    assert pool.idle_bytes == 3 * FBO_BYTES
+    # 6 units for a budget of 3: the two released first are freed
+    pool.release(large)
+    assert small.released and medium.released
+    assert small.color_attachments[0].released
+    assert not large.released
+    assert len(pool) == 1
+    assert pool.idle_bytes == 3 * FBO_BYTES
+
+    # A framebuffer over the whole budget can't be kept idle either
+    pool.release(pool.acquire((30, 20)))
+    assert len(pool) == 0
+    assert pool.idle_bytes == 0
+
+
+def test_releasing_a_size_again_makes_it_the_most_recent():
+    pool = FramebufferPool(FakeContext(), max_bytes=3 * FBO_BYTES)
+    first = pool.acquire(FBO_SIZE)
+    other_size = pool.acquire((20, 10))
+    second = pool.acquire(FBO_SIZE)
+
+    pool.release(first)
+    pool.release(other_size)
+    # 4 units for a budget of 3
+    pool.release(second)
+
+    # The 10x10 framebuffers were released last, the 20x10 one goes
+    assert other_size.released
+    assert not first.released and not second.released
+    assert pool.idle_bytes == 2 * FBO_BYTES
+
+
+def test_release_all_frees_the_idle_framebuffers():
+    pool = FramebufferPool(FakeContext())
+    in_use = pool.acquire(FBO_SIZE)
+    idle = pool.acquire(FBO_SIZE)
+    pool.release(idle)
+
+    pool.release_all()
+    assert idle.released
+    assert not in_use.released
+    assert len(pool) == 0
+    assert pool.idle_bytes == 0
+
+    # Framebuffers still in use can be released after
+    pool.release(in_use)
+    assert pool.acquire(FBO_SIZE) is in_use
+
+
+if __name__ == "__main__":
+    tests = [
+        test_released_framebuffer_is_reused,
+        test_least_recently_released_is_evicted_over_the_budget,
+        test_releasing_a_size_again_makes_it_the_most_recent,
+        test_release_all_frees_the_idle_framebuffers,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
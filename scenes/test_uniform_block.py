@@ -0,0 +1,172 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pyglet
+
+# Add parent directory to path so we can import from scenes, params, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+# No window is opened, keep pyglet (imported through the params) off the display
+pyglet.options["headless"] = True
+
+from scenes.uniform_block import Std140UniformBlock, define_in_source, parse_std140_block
+
+
+class FakeBuffer:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.writes = 0
+
+    def bind_to_uniform_block(self, binding: int):
+        pass
+
+    def write(self, data):
+        self.data = bytes(data)
+        self.writes += 1
+
+
+class FakeBlock:
+    binding = None
+
+
+class FakeContext:
+    def buffer(self, data: bytes) -> FakeBuffer:
+        return FakeBuffer(data)
+
+
+class FakeParam:
+    is_always_dirty = False
+
+    def __init__(self, name: str, value):
+        self.name = name
+        self.value = value
+        self.version = 0
+
+    def set(self, value):
+        self.value = value
+        self.version += 1
+
+
+def offsets(source: str) -> dict:
+    return {
+        member.name: (member.offset, member.size)
+        for member in parse_std140_block(source, "Params")
+    }
+
+
+def test_vec3_is_aligned_like_a_vec4():
+    source = """
+    uniform Params {
+        float a;
+        vec3 b;
+        float c;
+        vec2 d;
+        vec4 e;
+    };
+    """
+    assert offsets(source) == {
+        "a": (0, 4),
+        "b": (16, 12),
+        # A scalar fits in the padding after a vec3
+        "c": (28, 4),
+        "d": (32, 8),
+        "e": (48, 16),
+    }
+
+
+def test_array_elements_are_strided_to_a_vec4():
+    source = """
+    uniform Params {
+        float a;
+        float weights[3];
+        vec2 b;
+        vec3 colors[2];
+        int c;
+    };
+    """
+    assert offsets(source) == {
+        "a": (0, 4),
+        "weights": (16, 48),
+        "b": (64, 8),
+        "colors": (80, 32),
+        "c": (112, 4),
+    }
+
+
+def test_unsupported_member_type_raises():
+    source = "uniform Params { mat4 m; };"
+    try:
+        parse_std140_block(source, "Params")
+    except ValueError:
+        return
+    raise AssertionError("mat4 member was accepted")
+
+
+def test_define_goes_after_the_version_line():
+    source = "#version 330\nvoid main() {}\n"
+    assert define_in_source(source, "POST_PARAMS_UBO") == (
+        "#version 330\n#define POST_PARAMS_UBO\nvoid main() {}\n"
+    )
+
+
+def test_block_uploads_only_changed_params():
+    source = """
+    uniform Params {
+        float gain;
+        vec3 tint;
+        bool enabled;
+    };
+    """
+    gain = FakeParam("gain", 0.5)
+    tint = FakeParam("tint", (0.1, 0.2, 0.3))
+    enabled = FakeParam("enabled", True)
+    unrelated = FakeParam("unrelated", 1.0)
+    # Duck typed Params
+    params: list = [gain, tint, enabled, unrelated]
+    program = {"Params": FakeBlock()}
+    block = Std140UniformBlock(FakeContext(), program, source, "Params", params)
+    assert block.params == [gain, tint, enabled]
+
+    block.upload()
+    assert block.buffer.writes == 1
+    floats = np.frombuffer(block.buffer.data, dtype=np.float32)
+    ints = np.frombuffer(block.buffer.data, dtype=np.int32)
+    assert len(floats) == 8
+    assert floats[0] == np.float32(0.5)
+    assert np.allclose(floats[4:7], (0.1, 0.2, 0.3))
+    assert ints[7] == 1
+
+    block.upload()
+    assert block.buffer.writes == 1
+
+    gain.set(0.75)
+    block.upload()
+    assert block.buffer.writes == 2
+    assert np.frombuffer(block.buffer.data, dtype=np.float32)[0] == np.float32(0.75)
+
+
+def test_param_of_an_array_member_raises():
+    source = "uniform Params { float weights[4]; };"
+    params: list = [FakeParam("weights", 0.0)]
+    try:
+        Std140UniformBlock(FakeContext(), {"Params": FakeBlock()}, source, "Params", params)
+    except ValueError:
+        return
+    raise AssertionError("Param bound to an array member")
+
+
+if __name__ == "__main__":
+    tests = [
+        test_vec3_is_aligned_like_a_vec4,
+        test_array_elements_are_strided_to_a_vec4,
+        test_unsupported_member_type_raises,
+        test_define_goes_after_the_version_line,
+        test_block_uploads_only_changed_params,
+        test_param_of_an_array_member_raises,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
@@ -0,0 +1,117 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+from top_level.logger import get_logger
+
+
+TEXTURE_CACHE_DIR = Path(".cache") / "textures"
+TEXTURE_CACHE_SUFFIX = ".tex"
+
+# Magic, format version, width, height, components, source mtime (ns), source size
+_HEADER = struct.Struct("<4sIIIIqq")
+_MAGIC = b"SMTX"
+_VERSION = 1
+
+
+class DecodedImage(NamedTuple):
+    name: str
+    file_name: str
+    size: Tuple[int, int]
+    components: int
+    # Rows from top to bottom, as expected by ctx.texture
+    pixels: memoryview
+    # Mapped from the disk cache rather than decoded
+    is_cached: bool = False
+
+
+class TextureDiskCache:
+    """
+    Decoded texture pixels stored on disk, one file per source image.
+
+    An entry is the raw pixel rows after a small header, and is memory-mapped
+    when read, so a hit hands the page cache straight to the texture upload
+    without decoding or copying. Entries are invalid once the modification time
+    or size of their source image changes.
+    """
+
+    def __init__(self, cache_dir: Path = TEXTURE_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def entry_path(self, source: Path) -> Path:
+        return self.cache_dir / (source.name + TEXTURE_CACHE_SUFFIX)
+
+    def load(self, source: Path) -> Optional[DecodedImage]:
+        """
+        Map the cached pixels of a source image
+
+        Args:
+            source: The image file
+
+        Returns:
+            The cached image, or None if there is no valid entry
+        """
+        try:
+            stat = source.stat()
+            with open(self.entry_path(source), "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Missing entry, or an empty file which can't be mapped
+            return None
+
+        if len(mapped) < _HEADER.size:
+            mapped.close()
+            return None
+
+        magic, version, width, height, components, mtime_ns, size = _HEADER.unpack_from(
+            mapped
+        )
+        pixel_bytes = width * height * components
+        if (
+            magic != _MAGIC
+            or version != _VERSION
+            or mtime_ns != stat.st_mtime_ns
+            or size != stat.st_size
+            or len(mapped) != _HEADER.size + pixel_bytes
+        ):
+            mapped.close()
+            return None
+
+        # The view keeps the mapping alive until the upload is done with it
+        pixels = memoryview(mapped)[_HEADER.size:]
+        return DecodedImage(
+            source.stem, source.name, (width, height), components, pixels, is_cached=True
+        )
+
+    def store(self, source: Path, image: DecodedImage):
+        """
+        Write the decoded pixels of a source image
+
+        Args:
+            source: The image file the pixels were decoded from
+            image: The decoded image
+        """
+        stat = source.stat()
+        entry_path = self.entry_path(source)
+        temp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        header = _HEADER.pack(
+            _MAGIC,
+            _VERSION,
+            image.size[0],
+            image.size[1],
+            image.components,
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(header)
+                f.write(image.pixels)
+            # Readers see either the previous entry or the complete new one
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            get_logger().warning("Failed to write texture cache entry %s: %s", entry_path, e)
+            temp_path.unlink(missing_ok=True)
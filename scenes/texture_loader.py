@@ -0,0 +1,216 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Optional
+
+from scenes.texture_disk_cache import DecodedImage, TextureDiskCache
+from scenes.texture_registry import TextureRegistry
+from top_level.logger import get_logger
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".tga", ".gif"}
+# Bytes of pixel data written to textures per frame
+DEFAULT_UPLOAD_BYTES_PER_FRAME = 4 * 1024 * 1024
+DEFAULT_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def decode_image(path: Path) -> DecodedImage:
+    """
+    Decode an image file to RGB pixels
+
+    Args:
+        path: Image file, its stem is the texture name
+
+    Returns:
+        The decoded image
+    """
+    with Image.open(path) as img:
+        rgb = img.convert("RGB")
+        # The only copy of the decoded pixels, sliced without copying when uploaded
+        pixels = memoryview(rgb.tobytes())
+    return DecodedImage(path.stem, path.name, rgb.size, 3, pixels)
+
+
+class _Upload:
+    """A texture being written a few rows at a time"""
+
+    def __init__(self, image: DecodedImage, texture):
+        self.image = image
+        self.texture = texture
+        self.row_bytes = image.size[0] * image.components
+        self.next_row = 0
+
+    @property
+    def is_done(self) -> bool:
+        return self.next_row >= self.image.size[1]
+
+
+class TextureLoader:
+    """
+    Loads the images of a directory into named textures without blocking frames.
+
+    Every image is registered right away with a shared 1x1 placeholder texture,
+    so programs find their samplers bound from the first frame. The images are
+    decoded by a pool of worker threads (PIL releases the GIL while decoding)
+    and uploaded by the render thread within a bytes budget per frame. A texture
+    replaces its placeholder once all its rows are uploaded.
+
+    With a disk cache, images are decoded only when their cache entry is missing
+    or stale, and written to the cache by the worker that decoded them.
+    """
+
+    def __init__(
+        self,
+        screen_ctx,
+        texture_registry: TextureRegistry,
+        textures_dir: Path,
+        upload_bytes_per_frame: int = DEFAULT_UPLOAD_BYTES_PER_FRAME,
+        workers: int = DEFAULT_DECODE_WORKERS,
+        disk_cache: Optional[TextureDiskCache] = None,
+    ):
+        self.screen_ctx = screen_ctx
+        self.texture_registry = texture_registry
+        self.textures_dir = textures_dir
+        self.upload_bytes_per_frame = upload_bytes_per_frame
+        self.workers = workers
+        self.disk_cache = disk_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.placeholder = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Pending decodes and the file each one reads
+        self._decoding: Dict[Future, Path] = {}
+        self._uploads: Deque[_Upload] = deque()
+
+    def __len__(self) -> int:
+        """Number of textures not loaded yet"""
+        return len(self._decoding) + len(self._uploads)
+
+    def start(self):
+        """Register the placeholders and start decoding every image"""
+        if not PIL_AVAILABLE:
+            get_logger().warning(
+                "PIL/Pillow not available, textures will not be loaded. "
+                "Install Pillow with: pip install Pillow"
+            )
+            return
+
+        if not self.textures_dir.exists():
+            get_logger().warning("Textures directory %s does not exist", self.textures_dir)
+            return
+
+        image_files = [
+            path
+            for path in self.textures_dir.iterdir()
+            if path.suffix.lower() in IMAGE_EXTENSIONS
+        ]
+        if not image_files:
+            return
+
+        self.placeholder = self.screen_ctx.texture((1, 1), 3, bytes(3))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="texture-decode"
+        )
+        for path in image_files:
+            self.texture_registry.register(path.stem, self.placeholder)
+            self._decoding[self._executor.submit(self._read_image, path)] = path
+
+    def upload(self, max_bytes: Optional[int] = None) -> int:
+        """
+        Write the decoded images to their textures, up to a bytes budget
+
+        Args:
+            max_bytes: Budget of this call, defaults to upload_bytes_per_frame.
+                At least one row is written per call.
+
+        Returns:
+            The number of bytes written
+        """
+        budget = self.upload_bytes_per_frame if max_bytes is None else max_bytes
+        written = 0
+        while written < budget or written == 0:
+            if not self._uploads and not self._start_next_upload():
+                break
+
+            upload = self._uploads[0]
+            image = upload.image
+            width, height = image.size
+            rows = min(
+                height - upload.next_row,
+                max(1, (budget - written) // upload.row_bytes),
+            )
+            start = upload.next_row * upload.row_bytes
+            end = start + rows * upload.row_bytes
+            upload.texture.write(
+                image.pixels[start:end], viewport=(0, upload.next_row, width, rows)
+            )
+            upload.next_row += rows
+            written += end - start
+
+            if upload.is_done:
+                self._uploads.popleft()
+                self._finish_upload(upload)
+
+        if not len(self) and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            if self.disk_cache is not None:
+                get_logger().info(
+                    "Texture cache: %d hits, %d misses", self.cache_hits, self.cache_misses
+                )
+
+        return written
+
+    def finish(self):
+        """Block until every texture is loaded"""
+        for future in self._decoding:
+            future.exception()
+        while len(self):
+            self.upload(max_bytes=1 << 62)
+
+    def _read_image(self, path: Path) -> DecodedImage:
+        """Map the cached pixels of an image, or decode (and cache) them. Runs on a worker."""
+        if self.disk_cache is None:
+            return decode_image(path)
+
+        image = self.disk_cache.load(path)
+        if image is None:
+            image = decode_image(path)
+            self.disk_cache.store(path, image)
+        return image
+
+    def _start_next_upload(self) -> bool:
+        """Create the texture of the next decoded image, if any"""
+        for future in [future for future in self._decoding if future.done()]:
+            path = self._decoding.pop(future)
+            try:
+                image = future.result()
+            except Exception as e:
+                get_logger().error("Error loading texture %s: %s", path.name, e)
+                continue
+
+            texture = self.screen_ctx.texture(image.size, image.components)
+            self._uploads.append(_Upload(image, texture))
+            return True
+        return False
+
+    def _finish_upload(self, upload: _Upload):
+        texture = upload.texture
+        texture.filter = (self.screen_ctx.LINEAR, self.screen_ctx.LINEAR)
+        texture.build_mipmaps()
+
+        # Register texture with filename (without extension) as name
+        image = upload.image
+        if image.is_cached:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+        self.texture_registry.register(image.name, texture)
+        get_logger().info("Loaded texture: %s from %s", image.name, image.file_name)
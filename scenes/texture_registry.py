@@ -0,0 +1,111 @@
+import weakref
+from typing import Dict, List, Optional
+
+from top_level.logger import get_logger
+
+
+# Texture unit 0 is reserved for the first pass output (uTexture)
+FIRST_TEXTURE_UNIT = 1
+
+
+def uniform_name_candidates(texture_name: str) -> List[str]:
+    """
+    Uniform names a texture can be bound to, in order of preference:
+    - uTexture_<texture_name>
+    - <texture_name>
+    """
+    clean_name = texture_name.replace("-", "_").replace(" ", "_")
+    return [
+        f"uTexture_{clean_name}",  # uTexture_tv_error
+        clean_name,  # tv_error
+    ]
+
+
+class TextureRegistry:
+    """
+    Named textures, each bound to a texture unit allocated once.
+
+    Sampler uniforms of a program are resolved and assigned when the program is
+    added or a texture name is registered, and texture units are only rebound
+    when a texture object changes, so static textures cost nothing per frame.
+    """
+
+    def __init__(self, screen_ctx):
+        self.screen_ctx = screen_ctx
+        self._textures: Dict[str, object] = {}
+        self._units: Dict[str, int] = {}
+        # The last unit is used by moderngl for texture creation and updates
+        self._max_unit = screen_ctx.default_texture_unit - 1
+        self._programs: weakref.WeakSet = weakref.WeakSet()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._textures
+
+    def __len__(self) -> int:
+        return len(self._textures)
+
+    def get(self, name: str):
+        return self._textures.get(name)
+
+    def unit_of(self, name: str) -> Optional[int]:
+        return self._units.get(name)
+
+    def register(self, name: str, texture) -> int:
+        """
+        Register a texture, or replace the texture object of a registered name
+
+        Args:
+            name: Texture name (matched against sampler uniform names)
+            texture: The texture object
+
+        Returns:
+            The texture unit the texture is bound to
+        """
+        unit = self._units.get(name)
+        if unit is None:
+            unit = FIRST_TEXTURE_UNIT + len(self._units)
+            if unit > self._max_unit:
+                raise RuntimeError(
+                    f"No free texture unit for texture '{name}' "
+                    f"({len(self._units)} textures are already registered)."
+                )
+            self._units[name] = unit
+            for program in self._programs:
+                self._bind_sampler(program, name)
+
+        self._textures[name] = texture
+        texture.use(unit)
+        return unit
+
+    def add_program(self, program, warn_unmatched: bool = False):
+        """
+        Assign the texture units of all registered textures to a program's samplers
+
+        Args:
+            program: Shader program that may declare texture samplers
+            warn_unmatched: Report textures the program has no sampler for
+        """
+        if program in self._programs:
+            return
+
+        self._programs.add(program)
+        for name in self._textures:
+            if not self._bind_sampler(program, name) and warn_unmatched:
+                get_logger().warning(
+                    "Texture '%s' loaded but no matching uniform found in shader. "
+                    "Declare a uniform like 'uniform sampler2D %s;' in the shader.",
+                    name,
+                    uniform_name_candidates(name)[0],
+                )
+
+    def remove_program(self, program):
+        """Stop assigning texture units to a program (e.g. before releasing it)"""
+        self._programs.discard(program)
+
+    def _bind_sampler(self, program, name: str) -> bool:
+        for uniform_name in uniform_name_candidates(name):
+            if uniform_name in program:
+                program[uniform_name].value = self._units[name]
+                return True
+
+        return False
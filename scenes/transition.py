@@ -0,0 +1,39 @@
+from typing import Optional
+
+from scenes.scene import Scene
+from scenes.uniform_table import UniformTable
+
+
+# Values of uTransitionMode in transition.glsl
+TRANSITION_MODES = {"crossfade": 0, "wipe": 1, "dissolve": 2}
+DEFAULT_TRANSITION_DURATION = 1.0
+# Scale of the first pass resolution of both scenes while a transition runs
+DEFAULT_TRANSITION_RES_FACTOR = 0.5
+
+TRANSITION_FROM_TEXTURE = "transition_from"
+TRANSITION_TO_TEXTURE = "transition_to"
+
+
+class Transition:
+    """The outgoing scene of a transition, rendered until the incoming one replaced it"""
+
+    def __init__(self, scene: Scene, uniforms: UniformTable, duration: float):
+        self.scene = scene
+        self.uniforms = uniforms
+        self.duration = duration
+        self.fbo = None
+        self.start_time: Optional[float] = None
+
+    def progress(self, time: float) -> float:
+        """
+        Args:
+            time: Current time, the transition starts at the first call
+
+        Returns:
+            The progress of the transition, from 0 to 1
+        """
+        if self.start_time is None:
+            self.start_time = time
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (time - self.start_time) / self.duration))
@@ -0,0 +1,167 @@
+import re
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+
+from params.params import Param
+
+
+# std140 (size, alignment) in bytes of the supported member types
+STD140_LAYOUTS = {
+    "bool": (4, 4),
+    "int": (4, 4),
+    "uint": (4, 4),
+    "float": (4, 4),
+    "vec2": (8, 8),
+    "vec3": (12, 16),
+    "vec4": (16, 16),
+}
+INTEGER_TYPES = frozenset({"bool", "int", "uint"})
+# Array elements are aligned, and strided, to a vec4
+STD140_ARRAY_ALIGNMENT = 16
+
+_MEMBER_PATTERN = re.compile(r"^\s*(\w+)\s+(\w+)\s*(?:\[\s*(\d+)\s*\])?\s*;", re.MULTILINE)
+
+
+class BlockMember(NamedTuple):
+    name: str
+    gl_type: str
+    offset: int
+    # Number of elements of an array member, 0 for a plain member
+    array_length: int = 0
+
+    @property
+    def size(self) -> int:
+        """Size in bytes of the member, the padding of array elements included"""
+        size = STD140_LAYOUTS[self.gl_type][0]
+        if self.array_length:
+            return _round_up(size, STD140_ARRAY_ALIGNMENT) * self.array_length
+        return size
+
+
+def _round_up(value: int, alignment: int) -> int:
+    return (value + alignment - 1) // alignment * alignment
+
+
+def define_in_source(source: str, define: str) -> str:
+    """
+    Add a preprocessor define to a shader source, right after its #version line
+
+    Args:
+        source: GLSL source code
+        define: Name of the macro to define
+
+    Returns:
+        The patched source code
+    """
+    lines = source.splitlines(keepends=True)
+    insert_at = 1 if lines and lines[0].lstrip().startswith("#version") else 0
+    lines.insert(insert_at, f"#define {define}\n")
+    return "".join(lines)
+
+
+def parse_std140_block(source: str, block_name: str) -> List[BlockMember]:
+    """
+    Parse the members of a std140 uniform block and compute their offsets
+
+    Args:
+        source: GLSL source code declaring the block
+        block_name: Name of the uniform block
+
+    Returns:
+        Block members in declaration order
+    """
+    match = re.search(rf"uniform\s+{block_name}\s*\{{(.*?)\}}", source, re.DOTALL)
+    if match is None:
+        raise ValueError(f"Uniform block '{block_name}' not found in shader source.")
+
+    members = []
+    offset = 0
+    for gl_type, name, array_length in _MEMBER_PATTERN.findall(match.group(1)):
+        if gl_type not in STD140_LAYOUTS:
+            raise ValueError(
+                f"Unsupported type '{gl_type}' of member '{name}' in uniform block '{block_name}'."
+            )
+        alignment = STD140_LAYOUTS[gl_type][1]
+        if array_length:
+            alignment = max(alignment, STD140_ARRAY_ALIGNMENT)
+        offset = _round_up(offset, alignment)
+        member = BlockMember(name, gl_type, offset, int(array_length or 0))
+        members.append(member)
+        offset += member.size
+
+    return members
+
+
+class Std140UniformBlock:
+    """
+    Params packed into a NumPy backed std140 uniform buffer.
+
+    The buffer is written with a single call, and only on frames where one of
+    the packed params changed.
+    """
+
+    def __init__(
+        self,
+        screen_ctx,
+        program,
+        source: str,
+        block_name: str,
+        params: Iterable[Param],
+        binding: int = 0,
+    ):
+        members = parse_std140_block(source, block_name)
+        block_size = 16
+        if members:
+            block_size = _round_up(members[-1].offset + members[-1].size, 16)
+
+        self._floats = np.zeros(block_size // 4, dtype=np.float32)
+        self._ints = self._floats.view(np.int32)
+
+        members_by_name = {member.name: member for member in members}
+        self.params = [param for param in params if param.name in members_by_name]
+        for param in self.params:
+            if members_by_name[param.name].array_length:
+                raise ValueError(
+                    f"Param '{param.name}' can't be packed into the array member of "
+                    f"uniform block '{block_name}'."
+                )
+        self._slots = [
+            (
+                members_by_name[param.name].offset // 4,
+                STD140_LAYOUTS[members_by_name[param.name].gl_type][0] // 4,
+                members_by_name[param.name].gl_type in INTEGER_TYPES,
+            )
+            for param in self.params
+        ]
+        self._last_versions = [-1] * len(self.params)
+
+        self.buffer = screen_ctx.buffer(self._floats.tobytes())
+        self.binding = binding
+        program[block_name].binding = binding
+        self.buffer.bind_to_uniform_block(binding)
+
+    def upload(self):
+        """Pack the dirty params and write the buffer if any of them changed"""
+        is_dirty = False
+        for index, param in enumerate(self.params):
+            version = param.version
+            if version == self._last_versions[index] and not param.is_always_dirty:
+                continue
+
+            self._last_versions[index] = version
+            slot, count, is_integer = self._slots[index]
+            target = self._ints if is_integer else self._floats
+            value = param.value
+            if count > 1:
+                target[slot : slot + count] = value
+                is_dirty = True
+            elif target[slot] != value:
+                target[slot] = value
+                is_dirty = True
+
+        if is_dirty:
+            self.buffer.write(self._floats)
+
+    def release(self):
+        self.buffer.release()
@@ -0,0 +1,112 @@
+from collections.abc import Collection
+from typing import Any, Dict, Iterable
+
+from params.params import Param
+from top_level.logger import change_log
+
+
+_NOT_UPLOADED = object()
+
+
+def _values_changed(org_value, new_value):
+    """
+    Check if two values are significantly different
+
+    Args:
+        org_value: Original value
+        new_value: New value
+
+    Returns:
+        True if values have changed, False otherwise
+    """
+    if org_value is _NOT_UPLOADED:
+        return True
+
+    values_changed = False
+    try:
+        # For numeric types (float, int)
+        if isinstance(org_value, (int, float)) and isinstance(new_value, (int, float)):
+            values_changed = abs(org_value - new_value) > 1e-6
+
+        # For sequences (vectors, tuples, lists)
+        elif isinstance(org_value, Collection) and isinstance(new_value, Collection):
+            if len(org_value) == len(new_value):
+                values_changed = any(
+                    abs(a - b) > 1e-6 for a, b in zip(org_value, new_value)
+                )
+            else:
+                values_changed = True
+
+        # For other types, use direct comparison
+        else:
+            values_changed = org_value != new_value
+
+    except (TypeError, AttributeError):
+        # Fallback to direct comparison if numeric operations fail
+        values_changed = org_value != new_value
+
+    return values_changed
+
+
+class UniformTable:
+    """
+    Uniforms of a shader program resolved once when the program is created.
+
+    Keeps the controller version and value last uploaded to every uniform, so a
+    frame skips params nobody touched, only pushes the values that changed and
+    never reads uniforms back from the driver.
+    """
+
+    def __init__(self, program, params: Iterable[Param]):
+        self.program = program
+        self._param_uniforms = [
+            (param, program[param.name]) for param in params if param.name in program
+        ]
+        self._last_param_values = [_NOT_UPLOADED] * len(self._param_uniforms)
+        self._last_param_versions = [-1] * len(self._param_uniforms)
+        self._frame_uniforms: Dict[str, Any] = {}
+        self._last_frame_values: Dict[str, Any] = {}
+
+    def resolve(self, names: Iterable[str]):
+        """Look up per-frame uniforms ahead of their first set_uniform"""
+        for name in names:
+            if name not in self._frame_uniforms:
+                self._frame_uniforms[name] = self.program[name] if name in self.program else None
+
+    def set_uniform(self, name: str, value: Any):
+        """
+        Set a per-frame uniform (e.g. iTime) if the program declares it
+
+        Args:
+            name: Uniform name
+            value: New uniform value
+        """
+        try:
+            uniform = self._frame_uniforms[name]
+        except KeyError:
+            uniform = self.program[name] if name in self.program else None
+            self._frame_uniforms[name] = uniform
+
+        if uniform is None or self._last_frame_values.get(name) == value:
+            return
+
+        uniform.value = value
+        self._last_frame_values[name] = value
+
+    def upload_params(self):
+        """Upload the values of dirty params that changed since the last upload"""
+        last_values = self._last_param_values
+        last_versions = self._last_param_versions
+        for index, (param, uniform) in enumerate(self._param_uniforms):
+            version = param.version
+            if version == last_versions[index] and not param.is_always_dirty:
+                continue
+
+            last_versions[index] = version
+            value = param.value
+            if not _values_changed(last_values[index], value):
+                continue
+
+            uniform.value = value
+            last_values[index] = value
+            change_log.changed(param.name, value)
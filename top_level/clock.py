@@ -0,0 +1,87 @@
+import heapq
+import itertools
+import time
+from typing import Callable, List, Tuple
+
+
+class WallClock:
+    """Seconds since the epoch, as time.time()"""
+
+    def now(self) -> float:
+        return time.time()
+
+
+class VirtualClock:
+    """
+    Clock that only moves when told to, so time based controllers follow the
+    frames of an offline render instead of the wall clock
+    """
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def now(self) -> float:
+        return self._now
+
+    def set(self, now: float):
+        self._now = now
+
+
+class ScheduledCall:
+    """Handle of a callback scheduled on a Scheduler"""
+
+    __slots__ = ("time", "callback", "is_cancelled")
+
+    def __init__(self, time: float, callback: Callable[[], None]):
+        self.time = time
+        self.callback = callback
+        self.is_cancelled = False
+
+    def cancel(self):
+        self.is_cancelled = True
+
+
+class Scheduler:
+    """
+    The frame timestamp and the timed callbacks of the whole application.
+
+    The render loop ticks it once per frame: the clock is read once, and the
+    callbacks that came due run on the render thread, in time order. Between two
+    ticks everyone reads the same cached `now`, so a frame is consistent and a
+    VirtualClock makes it reproducible.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock or WallClock()
+        self.now = self.clock.now()
+        # (time, sequence, call) heap, cancelled calls are dropped when popped
+        self._calls: List[Tuple[float, int, ScheduledCall]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def tick(self) -> float:
+        """
+        Read the clock and run the callbacks due by now
+
+        Returns:
+            The new frame timestamp
+        """
+        self.now = now = self.clock.now()
+        calls = self._calls
+        while calls and calls[0][0] <= now:
+            call = heapq.heappop(calls)[2]
+            if not call.is_cancelled:
+                call.callback()
+        return now
+
+    def call_at(self, time: float, callback: Callable[[], None]) -> ScheduledCall:
+        """Run a callback on the first tick at or after a clock time"""
+        call = ScheduledCall(time, callback)
+        heapq.heappush(self._calls, (time, next(self._sequence), call))
+        return call
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> ScheduledCall:
+        """Run a callback on the first tick at least delay seconds from the frame timestamp"""
+        return self.call_at(self.now + delay, callback)
@@ -1,7 +1,10 @@
 from typing import NamedTuple, Optional
 
 from fakemidi.fakemidi import FakeMidi
+from inputs.audio import AudioInput
 from inputs.midi import MIDI_BUTTEN_CLICK, MIDI_DEC_VALUE, MIDI_INC_VALUE
+from top_level.clock import Scheduler
+from top_level.logger import change_log
 
 
 class TimeParams(NamedTuple):
@@ -35,8 +38,28 @@ class GlobalCtx:
         if not GlobalCtx._initialized:
             self.fake_midi: Optional[FakeMidi] = None
             self.starting_scene_name: Optional[str] = None
+            self.is_post_params_ubo = False
+            self.is_profiling = False
+            self.is_profile_overlay = False
+            self.profile_output: Optional[str] = None
+            self.target_fps: Optional[float] = None
+            self.transition_mode: Optional[str] = None
+            self.transition_duration: Optional[float] = None
+            self.transition_res_factor: Optional[float] = None
+            self.is_hot_reload = False
+            # AudioInput of --audio-device / --audio-wav
+            self.audio_input: Optional[AudioInput] = None
+            self.record_path: Optional[str] = None
+            self.record_fps: Optional[float] = None
+            self.midi_record_path: Optional[str] = None
+            # Seed of the random module, recorded so a replay makes the same choices
+            self.random_seed: Optional[int] = None
+            # Frame timestamp and timed callbacks, ticked by the render loop. Its
+            # clock is a VirtualClock offline.
+            self.scheduler = Scheduler()
             self.time_params: TimeParams = DEFAULT_TIME_PARAMS
             self.shared_values: dict = {}
+            self.shared_versions: dict = {}
             
             # Time adjustment state
             self.time_offset_step = TIME_OFFSET_STEP
@@ -66,7 +89,7 @@ class GlobalCtx:
             return
 
         current = self.time_params or DEFAULT_TIME_PARAMS
-        print(f"Update time offset to {current.offset + delta}")
+        change_log.changed("time offset", current.offset + delta)
         self._set_time_params(TimeParams(current.offset + delta, current.speed))
 
     def handle_increase_speed_button(self, value: int | None):
@@ -103,7 +126,7 @@ class GlobalCtx:
 
         current_time = self._last_time if self._last_time is not None else 0.0
         new_offset = current.offset + current_time * (current.speed - new_speed)
-        print(f"Update time speed to {new_speed}")
+        change_log.changed("time speed", new_speed)
         self._set_time_params(TimeParams(new_offset, new_speed))
 
     def _set_time_params(self, new_params: TimeParams):
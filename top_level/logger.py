@@ -0,0 +1,145 @@
+import atexit
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+
+LOGGER_NAME = "synmix"
+LOG_FORMAT = "%(asctime)s.%(msecs)03d %(levelname)-7s %(message)s"
+LOG_DATE_FORMAT = "%H:%M:%S"
+LOG_QUEUE_SIZE = 4096
+
+# Rate limit of similar messages
+RATE_LIMIT_MESSAGES = 10
+RATE_LIMIT_PERIOD = 1.0
+
+# Minimal interval between two reports of a changing value
+CHANGE_REPORT_INTERVAL = 0.25
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue handler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let at most RATE_LIMIT_MESSAGES similar records (same message template and
+    first argument) through per RATE_LIMIT_PERIOD, and report how many were
+    suppressed
+    """
+
+    def __init__(
+        self, max_messages: int = RATE_LIMIT_MESSAGES, period: float = RATE_LIMIT_PERIOD
+    ):
+        super().__init__()
+        self.max_messages = max_messages
+        self.period = period
+        # (template, first arg) -> [window start, records in window, suppressed records]
+        self._windows: Dict[tuple, List[Any]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = record.created
+        first_arg = record.args[0] if isinstance(record.args, tuple) and record.args else None
+        key = (record.msg, first_arg)
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.msg} (suppressed {suppressed} similar messages)"
+            return True
+
+        if window[1] < self.max_messages:
+            window[1] += 1
+            return True
+
+        window[2] += 1
+        return False
+
+
+_listener: Optional[QueueListener] = None
+
+
+def get_logger() -> logging.Logger:
+    return logging.getLogger(LOGGER_NAME)
+
+
+def setup_logging(level: int = logging.INFO):
+    """
+    Route the application logger through a queue drained by a background thread,
+    so logging never blocks the render thread on terminal I/O
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT, LOG_DATE_FORMAT))
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = _DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    logger = get_logger()
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+class ChangeLog:
+    """
+    Coalesces value change reports ("x changed 47 times, last value ...").
+
+    Recording a change is a dictionary update; the summary is logged by flush(),
+    which is called once per frame and reports at most every interval.
+    """
+
+    def __init__(self, interval: float = CHANGE_REPORT_INTERVAL):
+        self.interval = interval
+        self._pending: Dict[str, List[Any]] = {}
+        self._last_flush = 0.0
+
+    def changed(self, name: str, value: Any):
+        entry = self._pending.get(name)
+        if entry is None:
+            self._pending[name] = [1, value]
+        else:
+            entry[0] += 1
+            entry[1] = value
+
+    def flush(self, force: bool = False):
+        if not self._pending:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.interval:
+            return
+
+        self._last_flush = now
+        pending, self._pending = self._pending, {}
+        logger = get_logger()
+        for name, (count, value) in pending.items():
+            if count == 1:
+                logger.info("Set %s to %s", name, value)
+            else:
+                logger.info("%s changed %d times, last value %s", name, count, value)
+
+
+change_log = ChangeLog()
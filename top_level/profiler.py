@@ -0,0 +1,304 @@
+import csv
+import json
+import queue
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+from top_level.logger import get_logger
+
+
+# Spans of a frame, in the order they are reported
+FRAME_SPANS = (
+    "frame",
+    "fake_midi",
+    "midi",
+    "scene_load",
+    "texture_upload",
+    "fbo_resize",
+    "params",
+    "texture_bind",
+    "pass1",
+    "transition",
+    "pass2",
+    "prewarm",
+    "reload",
+    "record",
+)
+GPU_SPANS = ("pass1", "pass2")
+
+PROFILER_HISTORY_FRAMES = 256
+# Timer queries are read this many frames late, so reading them doesn't stall
+PROFILER_GPU_LATENCY = 3
+
+
+class FrameTimes(NamedTuple):
+    cpu_ns: Dict[str, int]
+    gpu_ns: Dict[str, int]
+
+
+class _Span:
+    __slots__ = ("cpu_ns", "name", "query", "start")
+
+    def __init__(self, cpu_ns: Dict[str, int], name: str, query):
+        self.cpu_ns = cpu_ns
+        self.name = name
+        self.query = query
+        self.start = 0
+
+    def __enter__(self):
+        if self.query is not None:
+            self.query.__enter__()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter_ns() - self.start
+        if self.query is not None:
+            self.query.__exit__(*exc_info)
+        self.cpu_ns[self.name] = self.cpu_ns.get(self.name, 0) + elapsed
+
+
+class _MetricsWriter:
+    """Appends profiler rows to a CSV or JSON lines file from a background thread"""
+
+    def __init__(self, output_path: str, columns: List[str]):
+        self.output_path = Path(output_path)
+        self.columns = columns
+        self.is_csv = self.output_path.suffix.lower() == ".csv"
+        self._rows: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: np.ndarray):
+        self._rows.put(rows)
+
+    def close(self):
+        """Write the rows still queued and stop the thread"""
+        self._rows.put(None)
+        self._thread.join()
+
+    def _run(self):
+        is_first_write = True
+        while (rows := self._rows.get()) is not None:
+            try:
+                with open(self.output_path, "w" if is_first_write else "a", newline="") as f:
+                    if self.is_csv:
+                        writer = csv.writer(f)
+                        if is_first_write:
+                            writer.writerow(self.columns)
+                        writer.writerows(rows.tolist())
+                    else:
+                        for row in rows.tolist():
+                            f.write(json.dumps(dict(zip(self.columns, row))) + "\n")
+                is_first_write = False
+            except OSError as e:
+                get_logger().error("Failed to write profiler metrics to %s: %s", self.output_path, e)
+
+
+class FrameProfiler:
+    """
+    Times named spans of a frame with time.perf_counter_ns, and GPU spans with
+    GL timer queries, keeping the last frames in a fixed-size ring buffer.
+
+    GPU spans must not be nested, as only one timer query can run at a time.
+    With gpu_latency > 0 timer queries are read that many frames later, so
+    reading them doesn't wait for the GPU.
+    """
+
+    def __init__(
+        self,
+        screen_ctx=None,
+        gpu_span_names: Iterable[str] = (),
+        span_names: Iterable[str] = FRAME_SPANS,
+        history: int = PROFILER_HISTORY_FRAMES,
+        gpu_latency: int = 0,
+        output_path: Optional[str] = None,
+    ):
+        gpu_span_names = tuple(gpu_span_names) if screen_ctx is not None else ()
+        self.span_names = tuple(span_names)
+        self.gpu_span_names = gpu_span_names
+        self.history = history
+        self.gpu_latency = gpu_latency
+        self.frame_count = 0
+        # Index of the last frame whose GPU times were read, -1 before any
+        self.last_gpu_frame = -1
+
+        self.cpu_history = np.zeros((history, len(self.span_names)), dtype=np.int64)
+        self.gpu_history = np.zeros((history, len(gpu_span_names)), dtype=np.int64)
+        self._span_columns = {name: index for index, name in enumerate(self.span_names)}
+
+        self._cpu_ns: Dict[str, int] = {}
+        self._query_sets = [
+            {name: screen_ctx.query(time=True) for name in gpu_span_names}
+            if screen_ctx is not None
+            else {}
+            for _ in range(gpu_latency + 1)
+        ]
+        self._used_queries: List[set] = [set() for _ in self._query_sets]
+        self._spans: List[Dict[str, _Span]] = [{} for _ in self._query_sets]
+
+        self._writer = None
+        self._flushed_frames = 0
+        if output_path:
+            columns = ["frame"] + [f"cpu_{name}_ns" for name in self.span_names]
+            columns += [f"gpu_{name}_ns" for name in gpu_span_names]
+            self._writer = _MetricsWriter(output_path, columns)
+
+    def span(self, name: str) -> _Span:
+        query_set_index = self.frame_count % len(self._query_sets)
+        spans = self._spans[query_set_index]
+        span = spans.get(name)
+        if span is None:
+            query = self._query_sets[query_set_index].get(name)
+            span = _Span(self._cpu_ns, name, query)
+            spans[name] = span
+        if span.query is not None:
+            self._used_queries[query_set_index].add(name)
+        return span
+
+    def end_frame(self) -> FrameTimes:
+        """
+        Store the times of the frame in the ring buffer and start a new one
+
+        Returns:
+            The CPU times of this frame, and the GPU times of the frame
+            gpu_latency frames ago
+        """
+        row = self.frame_count % self.history
+        cpu_row = self.cpu_history[row]
+        cpu_row[:] = 0
+        for name, value in self._cpu_ns.items():
+            column = self._span_columns.get(name)
+            if column is not None:
+                cpu_row[column] = value
+        cpu_ns = dict(self._cpu_ns)
+        self._cpu_ns.clear()
+
+        gpu_ns = {}
+        gpu_frame = self.frame_count - self.gpu_latency
+        if gpu_frame >= 0:
+            query_set_index = gpu_frame % len(self._query_sets)
+            queries = self._query_sets[query_set_index]
+            used_queries = self._used_queries[query_set_index]
+            gpu_row = self.gpu_history[gpu_frame % self.history]
+            for column, name in enumerate(self.gpu_span_names):
+                gpu_row[column] = queries[name].elapsed if name in used_queries else 0
+                if name in used_queries:
+                    gpu_ns[name] = int(gpu_row[column])
+            used_queries.clear()
+            self.last_gpu_frame = gpu_frame
+
+        self.frame_count += 1
+        self._flush_if_due()
+        return FrameTimes(cpu_ns, gpu_ns)
+
+    def last_gpu_ms(self, span: Optional[str] = None) -> float:
+        """
+        GPU time of the last frame whose GPU times were read, in ms
+
+        Args:
+            span: Name of a GPU span to get the time of, the total by default
+        """
+        if self.last_gpu_frame < 0:
+            return 0.0
+        gpu_row = self.gpu_history[self.last_gpu_frame % self.history]
+        if span is None:
+            return gpu_row.sum() / 1e6
+        if span not in self.gpu_span_names:
+            return 0.0
+        return gpu_row[self.gpu_span_names.index(span)] / 1e6
+
+    def recent_ms(self) -> np.ndarray:
+        """
+        Per frame (CPU frame time, GPU total time) in ms, indexed by ring row
+        """
+        frame_column = self._span_columns.get("frame")
+        cpu = (
+            self.cpu_history[:, frame_column]
+            if frame_column is not None
+            else self.cpu_history.sum(axis=1)
+        )
+        gpu = self.gpu_history.sum(axis=1)
+        return np.stack((cpu, gpu), axis=1) / 1e6
+
+    def close(self):
+        """Write the complete frames not written yet and wait for the writer"""
+        if self._writer is None:
+            return
+
+        self._flush()
+        self._writer.close()
+        self._writer = None
+
+    def _flush_if_due(self):
+        # Every half ring, so no frame is overwritten before it is written,
+        # whatever the frame rate
+        if self._writer is not None and (
+            self.frame_count - self.gpu_latency - self._flushed_frames >= self.history // 2
+        ):
+            self._flush()
+
+    def _flush(self):
+        # Only frames whose GPU times were read are complete
+        last_complete = self.frame_count - self.gpu_latency
+        if self._writer is None or last_complete <= self._flushed_frames:
+            return
+
+        frames = np.arange(self._flushed_frames, last_complete)
+        rows = frames % self.history
+        self._writer.submit(
+            np.column_stack((frames, self.cpu_history[rows], self.gpu_history[rows]))
+        )
+        self._flushed_frames = last_complete
+
+
+class NullProfiler:
+    """Profiler used when profiling is disabled, its spans do nothing"""
+
+    _null_span = nullcontext()
+    # No frame is ever timed on the GPU
+    last_gpu_frame = -1
+
+    def span(self, name: str):
+        return self._null_span
+
+    def end_frame(self) -> FrameTimes:
+        return FrameTimes({}, {})
+
+    def last_gpu_ms(self, span: Optional[str] = None) -> float:
+        return 0.0
+
+    def close(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class ProfilerOverlay:
+    """
+    Frame times history as a texture, drawn as a bar graph by the post
+    processing shader (uTexture_profiler_overlay)
+    """
+
+    TEXTURE_NAME = "profiler_overlay"
+
+    def __init__(self, screen_ctx, profiler: FrameProfiler):
+        self.profiler = profiler
+        self._texels = np.zeros((profiler.history, 4), dtype=np.float32)
+        self.texture = screen_ctx.texture((profiler.history, 1), 4, dtype="f4")
+        self.texture.filter = (screen_ctx.NEAREST, screen_ctx.NEAREST)
+
+    @property
+    def head(self) -> int:
+        """Ring row of the most recent frame"""
+        return (self.profiler.frame_count - 1) % self.profiler.history
+
+    def update(self):
+        self._texels[:, :2] = self.profiler.recent_ms()
+        self.texture.write(self._texels)
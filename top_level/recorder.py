@@ -0,0 +1,286 @@
+import multiprocessing
+import queue
+import shutil
+import subprocess
+from collections import deque
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Deque, List, Tuple
+
+import numpy as np
+
+from top_level.logger import get_logger
+
+
+DEFAULT_RECORD_FPS = 60.0
+# Frames between the read of a frame into a PBO and its copy out of it
+RECORD_PBO_COUNT = 3
+# Frames the encoder process can lag behind before frames are dropped
+RECORD_SHARED_SLOTS = 8
+# Seconds between checks that the encoder is still running, while waiting on it
+RECORD_ENCODER_POLL_INTERVAL = 0.5
+RECORD_COMPONENTS = 3
+RAW_SUFFIX = ".raw"
+PNG_SUFFIX = ".png"
+
+
+class _FfmpegWriter:
+    def __init__(self, output_path: Path, size: Tuple[int, int], fps: float):
+        width, height = size
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg", "-loglevel", "error", "-y",
+                "-f", "rawvideo", "-pix_fmt", "rgb24",
+                "-s", f"{width}x{height}", "-r", str(fps),
+                "-i", "-",
+                # GL rows are bottom to top
+                "-vf", "vflip",
+                "-c:v", "libx264", "-preset", "veryfast", "-crf", "18",
+                "-pix_fmt", "yuv420p",
+                str(output_path),
+            ],
+            stdin=subprocess.PIPE,
+        )
+        # Always set, stdin is a pipe
+        assert self._process.stdin is not None
+        self._stdin = self._process.stdin
+
+    def write(self, frame: memoryview):
+        self._stdin.write(frame)
+
+    def close(self):
+        self._stdin.close()
+        self._process.wait()
+
+
+class _RawWriter:
+    """Frames of RGB rows, bottom to top, one after the other in a single file"""
+
+    def __init__(self, output_path: Path, size: Tuple[int, int], fps: float):
+        self._file = open(output_path, "wb")
+
+    def write(self, frame: memoryview):
+        self._file.write(frame)
+
+    def close(self):
+        self._file.close()
+
+
+class _PngWriter:
+    """A numbered PNG file per frame: out.png -> out_000000.png, out_000001.png..."""
+
+    def __init__(self, output_path: Path, size: Tuple[int, int], fps: float):
+        from PIL import Image
+
+        self._image_module = Image
+        self._size = size
+        self._pattern = str(output_path.with_name(f"{output_path.stem}_{{:06d}}.png"))
+        self._index = 0
+
+    def write(self, frame: memoryview):
+        # Stride 0 and orientation -1: bottom to top rows
+        image = self._image_module.frombuffer(
+            "RGB", self._size, np.frombuffer(frame, dtype=np.uint8), "raw", "RGB", 0, -1
+        )
+        image.save(self._pattern.format(self._index))
+        self._index += 1
+        del image
+
+    def close(self):
+        pass
+
+
+def _make_writer(output_path: Path, size: Tuple[int, int], fps: float):
+    suffix = output_path.suffix.lower()
+    if suffix == RAW_SUFFIX:
+        return _RawWriter(output_path, size, fps)
+    if suffix == PNG_SUFFIX:
+        return _PngWriter(output_path, size, fps)
+    return _FfmpegWriter(output_path, size, fps)
+
+
+def _encode(
+    shm_name: str,
+    frame_bytes: int,
+    output_path: Path,
+    size: Tuple[int, int],
+    fps: float,
+    filled_slots,
+    free_slots,
+):
+    """Encoder process: write the frames of the filled slots, then free the slots"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    # Always set once attached
+    assert shm.buf is not None
+    shm_buffer = shm.buf
+    writer = _make_writer(output_path, size, fps)
+    try:
+        while (slot := filled_slots.get()) is not None:
+            frame = shm_buffer[slot * frame_bytes:(slot + 1) * frame_bytes]
+            writer.write(frame)
+            frame.release()
+            free_slots.put(slot)
+    finally:
+        writer.close()
+        shm.close()
+
+
+class Recorder:
+    """
+    Records the rendered frames without stalling the render loop.
+
+    A frame is read into a ring of pixel buffer objects, which the GPU fills
+    asynchronously. It is copied out RECORD_PBO_COUNT frames later, when the
+    transfer is long done, straight into a slot of a shared memory ring. An
+    encoder process writes the slots to ffmpeg (any video suffix), a .raw file
+    or a .png sequence. When every slot is still waiting for the encoder, the
+    frame is dropped and counted instead of waiting.
+    """
+
+    def __init__(
+        self,
+        screen_ctx,
+        output_path: str,
+        size: Tuple[int, int],
+        fps: float = DEFAULT_RECORD_FPS,
+        pbo_count: int = RECORD_PBO_COUNT,
+        slot_count: int = RECORD_SHARED_SLOTS,
+        is_lossless: bool = False,
+    ):
+        """
+        Args:
+            screen_ctx: The GL context
+            output_path: Video file (encoded by ffmpeg), .raw file or .png pattern
+            size: Frame size, frames of other sizes are dropped
+            fps: Frame rate of the video
+            pbo_count: Pixel buffer objects in the readback ring
+            slot_count: Frames in the shared memory ring
+            is_lossless: Wait for the encoder instead of dropping frames (offline)
+        """
+        self.output_path = Path(output_path)
+        if self.output_path.suffix.lower() not in (RAW_SUFFIX, PNG_SUFFIX) and (
+            shutil.which("ffmpeg") is None
+        ):
+            raise RuntimeError(
+                f"Recording to {self.output_path.name} requires ffmpeg in PATH "
+                f"(or record to a {RAW_SUFFIX} file or a {PNG_SUFFIX} sequence)."
+            )
+
+        self.size = tuple(size)
+        self.frame_bytes = self.size[0] * self.size[1] * RECORD_COMPONENTS
+        self.frames_captured = 0
+        self.frames_recorded = 0
+        self.dropped_frames = 0
+        self.is_lossless = is_lossless
+
+        self._pbos = [screen_ctx.buffer(reserve=self.frame_bytes) for _ in range(pbo_count)]
+        # Indices of the PBOs holding a frame not handed to the encoder yet, oldest first
+        self._pending: Deque[int] = deque()
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=self.frame_bytes * slot_count
+        )
+        self._free_slots: List[int] = list(range(slot_count))
+
+        mp_context = multiprocessing.get_context("spawn")
+        self._filled_queue = mp_context.Queue()
+        self._free_queue = mp_context.Queue()
+        self._encoder = mp_context.Process(
+            target=_encode,
+            args=(
+                self._shm.name,
+                self.frame_bytes,
+                self.output_path,
+                self.size,
+                fps,
+                self._filled_queue,
+                self._free_queue,
+            ),
+            name="recorder-encoder",
+            daemon=True,
+        )
+        self._encoder.start()
+        self._is_size_reported = False
+
+    def capture(self, framebuffer, size: Tuple[int, int]):
+        """
+        Queue the readback of a rendered frame
+
+        Args:
+            framebuffer: The framebuffer the frame was rendered to
+            size: Size of the rendered frame
+        """
+        if tuple(size) != self.size:
+            self.dropped_frames += 1
+            if not self._is_size_reported:
+                self._is_size_reported = True
+                get_logger().warning(
+                    "Frames of %dx%d are not recorded, the recording is %dx%d",
+                    *size,
+                    *self.size,
+                )
+            return
+
+        pbo_index = self.frames_captured % len(self._pbos)
+        if len(self._pending) == len(self._pbos):
+            self._hand_over(self._pending.popleft(), is_blocking=self.is_lossless)
+
+        framebuffer.read_into(
+            self._pbos[pbo_index],
+            viewport=(0, 0, *self.size),
+            components=RECORD_COMPONENTS,
+            alignment=1,
+        )
+        self._pending.append(pbo_index)
+        self.frames_captured += 1
+
+    def close(self):
+        """Hand the frames still in the PBOs to the encoder and wait for it"""
+        while self._pending:
+            self._hand_over(self._pending.popleft(), is_blocking=True)
+        self._filled_queue.put(None)
+        self._encoder.join()
+
+        for pbo in self._pbos:
+            pbo.release()
+        self._shm.close()
+        self._shm.unlink()
+        get_logger().info(
+            "Recorded %d frames to %s, %d dropped",
+            self.frames_recorded,
+            self.output_path,
+            self.dropped_frames,
+        )
+
+    def _hand_over(self, pbo_index: int, is_blocking: bool = False):
+        """Copy a PBO into a free shared memory slot and queue it for the encoder"""
+        self._collect_free_slots()
+        if not self._free_slots and is_blocking:
+            self._wait_free_slot()
+        if not self._free_slots:
+            self.dropped_frames += 1
+            return
+
+        slot = self._free_slots.pop()
+        self._pbos[pbo_index].read_into(
+            self._shm.buf, write_offset=slot * self.frame_bytes
+        )
+        self._filled_queue.put(slot)
+        self.frames_recorded += 1
+
+    def _wait_free_slot(self):
+        """Wait for the encoder to free a slot, unless it exited"""
+        while self._encoder.is_alive():
+            try:
+                self._free_slots.append(
+                    self._free_queue.get(timeout=RECORD_ENCODER_POLL_INTERVAL)
+                )
+                return
+            except queue.Empty:
+                continue
+
+    def _collect_free_slots(self):
+        while True:
+            try:
+                self._free_slots.append(self._free_queue.get_nowait())
+            except queue.Empty:
+                return
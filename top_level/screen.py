@@ -2,6 +2,8 @@ import moderngl_window as mglw
 from top_level.global_context import GlobalCtx
 from scenes.scenes_manager import ScenesManager
 from inputs.input_manager import MidiInputManager
+from scenes.transition import DEFAULT_TRANSITION_DURATION, DEFAULT_TRANSITION_RES_FACTOR
+from top_level.recorder import DEFAULT_RECORD_FPS, Recorder
 
 
 class Screen(mglw.WindowConfig):
@@ -25,18 +27,65 @@ class Screen(mglw.WindowConfig):
         )
         self.input_manager = MidiInputManager()
 
+        if global_ctx.is_profiling:
+            self.sm.enable_profiling(
+                output_path=global_ctx.profile_output,
+                is_overlay=global_ctx.is_profile_overlay,
+            )
+        if global_ctx.transition_mode:
+            # Unset when the context wasn't filled by main.py's arguments
+            duration = global_ctx.transition_duration
+            res_factor = global_ctx.transition_res_factor
+            self.sm.enable_transitions(
+                global_ctx.transition_mode,
+                DEFAULT_TRANSITION_DURATION if duration is None else duration,
+                DEFAULT_TRANSITION_RES_FACTOR if res_factor is None else res_factor,
+            )
+        if global_ctx.target_fps:
+            self.sm.enable_adaptive_resolution(global_ctx.target_fps)
+        if global_ctx.audio_input is not None:
+            self.sm.enable_audio(global_ctx.audio_input)
+        if global_ctx.is_hot_reload:
+            self.sm.enable_hot_reload()
+        if global_ctx.midi_record_path:
+            self.sm.enable_midi_recording(global_ctx.midi_record_path)
+
+        self.recorder = None
+        if global_ctx.record_path:
+            self.recorder = Recorder(
+                self.ctx,
+                global_ctx.record_path,
+                self.wnd.buffer_size,
+                fps=global_ctx.record_fps or DEFAULT_RECORD_FPS,
+            )
+
     def on_render(self, time: float, frame_time: float):
         """Main render loop - called every frame by moderngl-window"""
+        profiler = self.sm.profiler
 
-        if self.fake_midi:
-            self.fake_midi.handle_keys_input()
-            # Process pending messages on Windows
-            self.input_manager.process_fake_midi_messages()
-
-        # Delegate rendering to the current scene
-        resolution = (self.wnd.width, self.wnd.height, 1.0)
-        # self.scene.render(time, frame_time, resolution)
-        self.sm.render(time, frame_time, resolution)
+        with profiler.span("frame"):
+            if self.fake_midi:
+                with profiler.span("fake_midi"):
+                    self.fake_midi.handle_keys_input()
+                    # Process pending messages on Windows
+                    self.input_manager.process_fake_midi_messages()
+
+            # Delegate rendering to the current scene
+            resolution = (self.wnd.width, self.wnd.height, 1.0)
+            # self.scene.render(time, frame_time, resolution)
+            self.sm.render(time, frame_time, resolution)
+
+            if self.recorder is not None:
+                with profiler.span("record"):
+                    self.recorder.capture(self.ctx.screen, self.wnd.buffer_size)
+
+        profiler.end_frame()
+
+    def on_close(self):
+        self.sm.close()
+        self.sm.profiler.close()
+        if self.recorder is not None:
+            self.recorder.close()
 
     def on_key_event(self, key, action, modifiers):
         if self.fake_midi:
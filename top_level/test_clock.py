@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from top_level, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+from top_level.clock import Scheduler, VirtualClock
+
+
+def make_scheduler(start: float = 0.0):
+    clock = VirtualClock(start)
+    return Scheduler(clock), clock
+
+
+def test_now_only_changes_on_tick():
+    scheduler, clock = make_scheduler(5.0)
+    assert scheduler.now == 5.0
+
+    clock.set(6.0)
+    assert scheduler.now == 5.0
+    assert scheduler.tick() == 6.0
+    assert scheduler.now == 6.0
+
+
+def test_due_calls_run_in_time_order():
+    scheduler, clock = make_scheduler()
+    calls = []
+    scheduler.call_at(3.0, lambda: calls.append("c"))
+    scheduler.call_at(1.0, lambda: calls.append("a"))
+    scheduler.call_at(2.0, lambda: calls.append("b"))
+    # Same time: in the order they were scheduled
+    scheduler.call_at(2.0, lambda: calls.append("b2"))
+
+    clock.set(0.5)
+    scheduler.tick()
+    assert calls == []
+
+    clock.set(2.0)
+    scheduler.tick()
+    assert calls == ["a", "b", "b2"]
+    assert len(scheduler) == 1
+
+    clock.set(10.0)
+    scheduler.tick()
+    assert calls == ["a", "b", "b2", "c"]
+    assert len(scheduler) == 0
+
+
+def test_call_later_counts_from_the_frame_timestamp():
+    scheduler, clock = make_scheduler(1.0)
+    calls = []
+    # The clock moved, the frame timestamp didn't
+    clock.set(1.5)
+    scheduler.call_later(1.0, lambda: calls.append(scheduler.now))
+
+    clock.set(1.9)
+    scheduler.tick()
+    assert calls == []
+
+    clock.set(2.0)
+    scheduler.tick()
+    assert calls == [2.0]
+
+
+def test_cancelled_call_does_not_run():
+    scheduler, clock = make_scheduler()
+    calls = []
+    cancelled = scheduler.call_at(1.0, lambda: calls.append("cancelled"))
+    scheduler.call_at(1.0, lambda: calls.append("kept"))
+    cancelled.cancel()
+
+    clock.set(1.0)
+    scheduler.tick()
+    assert calls == ["kept"]
+    assert len(scheduler) == 0
+
+
+def test_call_scheduled_by_a_callback_waits_for_its_time():
+    scheduler, clock = make_scheduler()
+    calls = []
+
+    def reschedule():
+        calls.append(scheduler.now)
+        scheduler.call_later(1.0, lambda: calls.append(scheduler.now))
+
+    scheduler.call_at(1.0, reschedule)
+    clock.set(1.0)
+    scheduler.tick()
+    assert calls == [1.0]
+
+    clock.set(2.0)
+    scheduler.tick()
+    assert calls == [1.0, 2.0]
+
+
+if __name__ == "__main__":
+    tests = [
+        test_now_only_changes_on_tick,
+        test_due_calls_run_in_time_order,
+        test_call_later_counts_from_the_frame_timestamp,
+        test_cancelled_call_does_not_run,
+        test_call_scheduled_by_a_callback_waits_for_its_time,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")
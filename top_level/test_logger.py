@@ -0,0 +1,105 @@
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import from top_level, etc.
+script_dir = Path(__file__).resolve().parent
+project_root = script_dir.parent
+sys.path.insert(0, str(project_root))
+
+from top_level.logger import ChangeLog, RateLimitFilter, get_logger
+
+
+class CapturingHandler(logging.Handler):
+    """Keeps the formatted messages of the records it receives"""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(record.getMessage())
+
+
+def capture_logger() -> CapturingHandler:
+    handler = CapturingHandler()
+    logger = get_logger()
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
+
+
+def release_logger(handler: CapturingHandler):
+    get_logger().removeHandler(handler)
+
+
+def make_record(message: str, args: tuple, created: float) -> logging.LogRecord:
+    record = logging.LogRecord("test", logging.WARNING, __file__, 0, message, args, None)
+    record.created = created
+    return record
+
+
+def test_change_log_coalesces_changes_per_name():
+    handler = capture_logger()
+    try:
+        change_log = ChangeLog(interval=0.0)
+        for value in range(5):
+            change_log.changed("zoom", value)
+        change_log.changed("speed", 2.0)
+        change_log.flush()
+    finally:
+        release_logger(handler)
+
+    assert handler.messages == [
+        "zoom changed 5 times, last value 4",
+        "Set speed to 2.0",
+    ]
+
+
+def test_change_log_reports_at_most_every_interval():
+    handler = capture_logger()
+    try:
+        change_log = ChangeLog(interval=60.0)
+        change_log.changed("zoom", 1)
+        change_log.flush()
+        change_log.changed("zoom", 2)
+        change_log.changed("zoom", 3)
+        # Within the interval, the changes keep coalescing
+        change_log.flush()
+        assert handler.messages == ["Set zoom to 1"]
+
+        change_log.flush(force=True)
+        # Nothing left to report
+        change_log.flush(force=True)
+    finally:
+        release_logger(handler)
+
+    assert handler.messages == ["Set zoom to 1", "zoom changed 2 times, last value 3"]
+
+
+def test_rate_limit_filter_suppresses_similar_messages():
+    rate_limit = RateLimitFilter(max_messages=2, period=1.0)
+    passed = [
+        rate_limit.filter(make_record("No binding for %s", ("knob",), created=10.0 + i * 0.1))
+        for i in range(5)
+    ]
+    assert passed == [True, True, False, False, False]
+
+    # Another first argument is limited on its own
+    assert rate_limit.filter(make_record("No binding for %s", ("wheel",), created=10.5))
+
+    # The next period starts over, and reports what was suppressed
+    record = make_record("No binding for %s", ("knob",), created=11.1)
+    assert rate_limit.filter(record)
+    assert record.msg == "No binding for %s (suppressed 3 similar messages)"
+
+
+if __name__ == "__main__":
+    tests = [
+        test_change_log_coalesces_changes_per_name,
+        test_change_log_reports_at_most_every_interval,
+        test_rate_limit_filter_suppresses_similar_messages,
+    ]
+    for test in tests:
+        test()
+        print(f"✓ {test.__name__}")